@@ -0,0 +1,128 @@
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from neighbor_index import top_k
+
+# Approximate nearest neighbours for catalogs too large for exact search.
+#
+# IVF ("inverted file") index: the normalized term vectors are clustered with
+# spherical k-means, and every movie is stored in the list of its closest
+# centroid. A query only scores the movies of the `nprobe` lists whose
+# centroids are closest to it, so the cost per query is about
+# nprobe / n_lists of a brute-force scan. `nprobe` is the recall/latency knob:
+# nprobe == n_lists is exact search.
+
+
+def spherical_kmeans(vectors, n_clusters, n_iter=10, sample_size=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    n = vectors.shape[0]
+    sample = vectors[rng.choice(n, size=min(sample_size, n), replace=False)]
+
+    centroids = sample[rng.choice(sample.shape[0], size=n_clusters, replace=False)]
+    centroids = centroids.toarray() if sparse.issparse(centroids) else np.array(centroids)
+
+    for _ in range(n_iter):
+        assign = np.asarray(sample @ centroids.T).argmax(axis=1)
+        members = sparse.csr_matrix((np.ones(len(assign)), (assign, np.arange(len(assign)))),
+                                    shape=(n_clusters, sample.shape[0]))
+        sums = members @ sample
+        sums = sums.toarray() if sparse.issparse(sums) else np.asarray(sums)
+
+        empty = np.flatnonzero(members.getnnz(axis=1) == 0)
+        if len(empty):  # restart empty clusters from random points
+            restart = sample[rng.choice(sample.shape[0], size=len(empty), replace=False)]
+            sums[empty] = restart.toarray() if sparse.issparse(restart) else restart
+        centroids = normalize(sums).astype(np.float32)
+
+    return centroids
+
+
+class IVFIndex:
+
+    def __init__(self, vectors, centroids, order, offsets, nprobe=8):
+        # vectors: L2-normalized csr float32 (n_movies, n_terms), in catalog order.
+        # They are kept grouped by list, so every list is a contiguous block of rows.
+        self.centroids = centroids  # (n_lists, n_terms) float32
+        self.order = order          # catalog rows grouped by list
+        self.offsets = offsets      # list i is order[offsets[i]:offsets[i + 1]]
+        self.nprobe = nprobe
+        self.grouped = vectors[order]
+        self.position = np.empty_like(order)
+        self.position[order] = np.arange(len(order), dtype=order.dtype)
+
+    @classmethod
+    def build(cls, vectors, n_lists=None, nprobe=8, n_iter=10, sample_size=20000, seed=0):
+        vectors = sparse.csr_matrix(normalize(vectors), dtype=np.float32)
+        n_lists = n_lists or max(1, int(np.sqrt(vectors.shape[0])))
+        centroids = spherical_kmeans(vectors, n_lists, n_iter, sample_size, seed)
+
+        assign = np.empty(vectors.shape[0], dtype=np.int32)
+        for start in range(0, vectors.shape[0], 65536):
+            assign[start:start + 65536] = np.asarray(vectors[start:start + 65536] @ centroids.T).argmax(axis=1)
+
+        order = np.argsort(assign, kind='stable').astype(np.int32)
+        offsets = np.searchsorted(assign[order], np.arange(n_lists + 1)).astype(np.int64)
+        return cls(vectors, centroids, order, offsets, nprobe)
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    def search(self, rows, k, nprobe=None):
+        # Approximate top-k neighbours of catalog rows, the row itself excluded.
+        # Work is done list by list: every probed list is scored against all the
+        # queries that probe it in one sparse product, then merged into their top-k.
+        rows = np.asarray(rows, dtype=np.int64)
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        queries = self.grouped[self.position[rows]]
+        probes, _ = top_k(np.asarray(queries @ self.centroids.T), nprobe)
+
+        neighbors = np.full((len(rows), k), -1, dtype=np.int32)
+        scores = np.full((len(rows), k), -np.inf, dtype=np.float32)
+
+        for l in np.unique(probes):
+            start, stop = self.offsets[l], self.offsets[l + 1]
+            if start == stop:
+                continue
+            q = np.flatnonzero((probes == l).any(axis=1))
+            members = self.order[start:stop]
+
+            sims = (queries[q] @ self.grouped[start:stop].T).toarray()
+            sims[members[None, :] == rows[q, None]] = -np.inf  # skip the movie itself
+            best, best_scores = top_k(sims, min(k, len(members)))
+
+            ids = np.hstack([neighbors[q], members[best]])
+            merged, scores[q] = top_k(np.hstack([scores[q], best_scores]), k)
+            neighbors[q] = np.take_along_axis(ids, merged, axis=1)
+
+        neighbors[np.isneginf(scores)] = -1
+        return neighbors, scores
+
+
+# --- Save / Load (the vectors themselves live in vectors.npz) ---
+def save_ivf_index(index, path):
+    with open(path, 'wb') as f:
+        np.savez(f, centroids=index.centroids, order=index.order, offsets=index.offsets, nprobe=index.nprobe)
+
+
+def load_ivf_index(path, vectors):
+    with np.load(path) as data:
+        vectors = sparse.csr_matrix(normalize(vectors), dtype=np.float32)
+        return IVFIndex(vectors, data['centroids'], data['order'], data['offsets'], int(data['nprobe']))
+
+
+# --- CLI: python ann_index.py vectors.npz ivf.npz --nprobe 8 ---
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Build the IVF approximate nearest-neighbour index.")
+    parser.add_argument('vectors', help="vectors.npz written by code.ipynb / build_model.py")
+    parser.add_argument('out', help="where to write the index, e.g. ivf.npz")
+    parser.add_argument('--n-lists', type=int, default=None, help="number of clusters (default: sqrt(n_movies))")
+    parser.add_argument('--nprobe', type=int, default=8, help="lists scanned per query, higher = better recall, slower")
+    args = parser.parse_args()
+
+    index = IVFIndex.build(sparse.load_npz(args.vectors), n_lists=args.n_lists, nprobe=args.nprobe)
+    save_ivf_index(index, args.out)
+    print(f"{len(index.order)} movies in {index.n_lists} lists written to {args.out}")
@@ -0,0 +1,73 @@
+import argparse
+import time
+
+import numpy as np
+from scipy import sparse
+
+from ann_index import IVFIndex
+from recommender import Recommender
+
+# Reports recall@K and query latency of the IVF index against exact cosine search.
+#
+#   python ann_recall.py --vectors vectors.npz --k 9 --nprobe 1 2 4 8 16
+#   python ann_recall.py --synthetic 200000 --n-lists 500
+
+
+def synthetic_vectors(n_movies, n_terms=5000, n_topics=200, terms_per_movie=40, seed=0):
+    # Bag-of-words counts where every movie draws most of its terms from one topic,
+    # which gives the catalog the clustered structure real tags have.
+    rng = np.random.default_rng(seed)
+    topic_terms = rng.integers(0, n_terms, size=(n_topics, 60))
+    topics = rng.integers(0, n_topics, size=n_movies)
+
+    cols = np.where(rng.random((n_movies, terms_per_movie)) < 0.7,
+                    topic_terms[topics[:, None], rng.integers(0, 60, size=(n_movies, terms_per_movie))],
+                    rng.integers(0, n_terms, size=(n_movies, terms_per_movie)))
+    rows = np.repeat(np.arange(n_movies), terms_per_movie)
+    vectors = sparse.csr_matrix((np.ones(rows.size, dtype=np.float32), (rows, cols.ravel())), shape=(n_movies, n_terms))
+    vectors.sum_duplicates()
+    return vectors
+
+
+def recall_at_k(approx_scores, exact_scores):
+    # Scored rather than id based, so that movies tied with the exact K-th
+    # neighbour count as hits whichever of them was returned.
+    kth = exact_scores[:, -1:] - 1e-6
+    return np.sum(approx_scores >= kth) / exact_scores.size
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recall@K of the ANN backend against exact cosine similarity.")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument('--vectors', help="vectors.npz written by code.ipynb / build_model.py")
+    source.add_argument('--synthetic', type=int, metavar='N_MOVIES', help="use a synthetic catalog of this size")
+    parser.add_argument('--k', type=int, default=9)
+    parser.add_argument('--queries', type=int, default=500, help="number of sampled query movies")
+    parser.add_argument('--n-lists', type=int, default=None, help="IVF lists (default: sqrt(n_movies))")
+    parser.add_argument('--nprobe', type=int, nargs='+', default=[1, 2, 4, 8, 16, 32])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    vectors = sparse.load_npz(args.vectors) if args.vectors else synthetic_vectors(args.synthetic, seed=args.seed)
+    n = vectors.shape[0]
+    rows = np.random.default_rng(args.seed).choice(n, size=min(args.queries, n), replace=False)
+
+    t = time.perf_counter()
+    ann = IVFIndex.build(vectors, n_lists=args.n_lists, seed=args.seed)
+    print(f"{n} movies, {ann.n_lists} lists, index built in {time.perf_counter() - t:.2f}s")
+
+    exact = Recommender(np.arange(n), vectors=vectors)
+    t = time.perf_counter()
+    _, exact_scores = exact.neighbors_many(rows, args.k)
+    exact_ms = (time.perf_counter() - t) * 1000 / len(rows)
+    print(f"exact      : recall@{args.k} 1.0000  {exact_ms:8.3f} ms/query")
+
+    for nprobe in args.nprobe:
+        t = time.perf_counter()
+        _, approx_scores = ann.search(rows, args.k, nprobe=nprobe)
+        ms = (time.perf_counter() - t) * 1000 / len(rows)
+        print(f"nprobe {nprobe:>4}: recall@{args.k} {recall_at_k(approx_scores, exact_scores):.4f}  {ms:8.3f} ms/query")
+
+
+if __name__ == '__main__':
+    main()
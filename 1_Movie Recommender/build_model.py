@@ -0,0 +1,140 @@
+import argparse
+import os
+import pickle
+import tempfile
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.feature_extraction.text import CountVectorizer
+
+from neighbor_index import DEFAULT_K, build_neighbor_index, save_neighbor_index
+from tags import director, loads, make_tags, names, stem
+
+# Streaming version of code.ipynb for catalogs far larger than TMDB 5000.
+#
+#   1. tmdb_5000_credits.csv is streamed in chunks and reduced to the top 3
+#      cast names and the director of every title.
+#   2. tmdb_5000_movies.csv is streamed in chunks, joined on title, and the
+#      chunks are parsed, tagged and stemmed in a process pool. The stemmed
+#      tags are spooled to a temporary file and term frequencies are counted.
+#   3. The max_features most frequent terms become the vocabulary, and the
+#      spooled tags are vectorized chunk by chunk into a sparse matrix.
+#   4. The top-K neighbour index is built block by block from that matrix.
+#
+# Nothing is ever densified, so memory is bounded by the chunk size, the
+# sparse term matrix and the neighbour index.
+#
+#   python build_model.py --movies tmdb_5000_movies.csv --credits tmdb_5000_credits.csv
+
+MOVIE_COLUMNS = ['title', 'overview', 'genres', 'keywords']
+CREDIT_COLUMNS = ['movie_id', 'title', 'cast', 'crew']
+
+
+def read_credits(path, chunksize):
+    # title -> [(movie_id, cast, crew), ...]; a list because merge() on title pairs every duplicate
+    credits = {}
+    for chunk in pd.read_csv(path, usecols=CREDIT_COLUMNS, chunksize=chunksize):
+        chunk = chunk.dropna()
+        for movie_id, title, cast, crew in zip(chunk['movie_id'], chunk['title'], chunk['cast'], chunk['crew']):
+            credits.setdefault(title, []).append((int(movie_id), names(cast, 3), director(crew)))
+    return credits
+
+
+def join_credits(chunk, credits):
+    chunk = chunk.dropna()
+    rows = []
+    for title, overview, genres, keywords in zip(chunk['title'], chunk['overview'], chunk['genres'], chunk['keywords']):
+        for movie_id, cast, crew in credits.get(title, ()):
+            rows.append((movie_id, title, overview, genres, keywords, cast, crew))
+    return rows
+
+
+def tag_rows(rows):
+    # Runs in a worker process: parse genres/keywords, build and stem the tags, count terms.
+    analyzer = CountVectorizer(stop_words='english').build_analyzer()
+    out, counts = [], Counter()
+    for movie_id, title, overview, genres, keywords, cast, crew in rows:
+        tags = stem(make_tags(overview, names(loads(genres)), names(loads(keywords)), cast, crew))
+        counts.update(analyzer(tags))
+        out.append((movie_id, title, tags))
+    return out, counts
+
+
+def _ordered_results(executor, jobs, max_pending):
+    # Like executor.map(), but only keeps `max_pending` chunks in flight.
+    pending = deque()
+    for job in jobs:
+        pending.append(executor.submit(tag_rows, job))
+        if len(pending) >= max_pending:
+            yield pending.popleft().result()
+    while pending:
+        yield pending.popleft().result()
+
+
+def select_vocabulary(counts, max_features):
+    # Same choice as CountVectorizer(max_features=...): terms sorted alphabetically,
+    # then the most frequent ones are kept.
+    terms = np.array(sorted(counts), dtype=object)
+    tfs = np.array([counts[t] for t in terms])
+    keep = (-tfs).argsort()[:max_features]
+    return sorted(terms[keep].tolist())
+
+
+def build(movies_csv, credits_csv, out_dir='.', k=DEFAULT_K, max_features=5000, chunksize=2000, workers=None):
+    credits = read_credits(credits_csv, chunksize)
+    jobs = (join_credits(chunk, credits) for chunk in pd.read_csv(movies_csv, usecols=MOVIE_COLUMNS, chunksize=chunksize))
+
+    workers = workers or os.cpu_count()
+    counts = Counter()
+    movie_ids, titles = [], []
+    with tempfile.TemporaryFile('w+', encoding='utf-8') as spool:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            for tagged, chunk_counts in _ordered_results(executor, jobs, max_pending=2 * workers):
+                counts.update(chunk_counts)
+                for movie_id, title, tags in tagged:
+                    movie_ids.append(movie_id)
+                    titles.append(title)
+                    spool.write(tags + "\n")
+
+        cv = CountVectorizer(stop_words='english', vocabulary=select_vocabulary(counts, max_features))
+        spool.seek(0)
+        blocks, batch = [], []
+        for line in spool:
+            batch.append(line.rstrip("\n"))
+            if len(batch) == chunksize:
+                blocks.append(cv.transform(batch))
+                batch = []
+        if batch:
+            blocks.append(cv.transform(batch))
+        vectors = sparse.vstack(blocks, format='csr')
+
+        # Tags are kept in the catalog (as in the notebook) so incremental.py can work from it.
+        spool.seek(0)
+        catalog = pd.DataFrame({'movie_id': movie_ids, 'title': titles, 'tags': [line.rstrip("\n") for line in spool]})
+
+    index = build_neighbor_index(vectors, k=k)
+
+    save_neighbor_index(index, os.path.join(out_dir, 'neighbors.npz'))
+    sparse.save_npz(os.path.join(out_dir, 'vectors.npz'), vectors)
+    pickle.dump(cv, open(os.path.join(out_dir, 'count_vectorizer.pkl'), 'wb'))
+    pickle.dump(catalog.to_dict(), open(os.path.join(out_dir, 'movies_dict.pkl'), 'wb'))
+    return catalog, vectors, index
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the movie recommender artifacts in bounded memory.")
+    parser.add_argument('--movies', default='tmdb_5000_movies.csv')
+    parser.add_argument('--credits', default='tmdb_5000_credits.csv')
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--k', type=int, default=DEFAULT_K, help="neighbours kept per movie")
+    parser.add_argument('--max-features', type=int, default=5000)
+    parser.add_argument('--chunksize', type=int, default=2000, help="CSV rows per chunk")
+    parser.add_argument('--workers', type=int, default=None, help="stemming processes (default: all cores)")
+    args = parser.parse_args()
+
+    catalog, vectors, index = build(args.movies, args.credits, args.out_dir, args.k,
+                                    args.max_features, args.chunksize, args.workers)
+    print(f"{len(catalog)} movies, {vectors.shape[1]} terms, {vectors.nnz} non-zeros, top-{index.k} index written to {args.out_dir}")
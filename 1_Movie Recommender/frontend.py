@@ -1,7 +1,15 @@
 import streamlit as st
-import pickle
+import os
+import sys
 import pandas as pd
-import requests
+from pathlib import Path
+from movie_metadata import MovieMetadataClient, OMDB_URL
+from neighbor_index import load_neighbor_index
+from recommender import Recommender
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'common'))
+from instrumentation import profile_once, stage, timed # Stage timings, see common/instrumentation.py
+from mmap_artifacts import load_artifact # Memory-mapped .mmap artifacts when converted, else the pickles
 
 # --- Page Configuration ---
 st.set_page_config(
@@ -70,32 +78,31 @@ h1 { color: var(--primary-color); text-align: center; }
 st.markdown(f'<style>{CSS}</style>', unsafe_allow_html=True)
 
 # --- Load Data ---
-@st.cache_data
+@st.cache_resource
+@timed('movies.load_data')
 def load_data():
-    movies_dict = pickle.load(open('movies_dict.pkl', 'rb'))
+    movies_dict = load_artifact('movies_dict.pkl')
     movies = pd.DataFrame(movies_dict)
-    similarity = pickle.load(open('similarity.pkl', 'rb'))
-    return movies, similarity
+    index = load_neighbor_index('neighbors.npz', loader=load_artifact) # Precomputed top-K neighbours (see code.ipynb)
+    return movies, Recommender(movies['title'].values, index=index)
 
-movies, similarity = load_data()
+movies, recommender = load_data()
 
 
 # --- API Call and HTML Template Functions ---
-def fetch_movie_details(movie_title):
+@st.cache_resource
+def get_metadata_client():
     try: api_key = st.secrets["omdb_api_key"]
     except (FileNotFoundError, KeyError): api_key = 'your_api_key_here' # Fallback key
 
-    url = f"http://www.omdbapi.com/?t={movie_title}&apikey={api_key}"
-    try:
-        response = requests.get(url)
-        response.raise_for_status()
-        data = response.json()
-        if data.get('Response') == 'True':
-            poster = data.get('Poster', "https://via.placeholder.com/500x750.png?text=No+Poster")
-            if poster == 'N/A': poster = "https://via.placeholder.com/500x750.png?text=No+Poster"
-            return {"title": data.get('Title'), "year": data.get('Year'), "plot": data.get('Plot'), "poster": poster}
-        return None
-    except requests.exceptions.RequestException: return None
+    # Pooled, cached, concurrent OMDb client. OMDB_BASE_URL can point it at a local stub server.
+    return MovieMetadataClient(api_key, base_url=os.environ.get('OMDB_BASE_URL', OMDB_URL))
+
+metadata_client = get_metadata_client()
+
+@timed('movies.fetch_movie_details')
+def fetch_movie_details(movie_title):
+    return metadata_client.fetch(movie_title)
 
 # Added **kwargs to accept and ignore extra arguments like 'plot'
 def recommendation_card_html(title, year, poster, **kwargs):
@@ -106,10 +113,10 @@ def selected_movie_html(title, year, plot, poster):
 
 # --- Recommendation Logic ---
 def recommend(movie, num_recommendations=5):
-    movie_index = movies[movies['title'] == movie].index[0]
-    distances = similarity[movie_index]
-    movies_list = sorted(list(enumerate(distances)), reverse=True, key=lambda x: x[1])[1:num_recommendations+1]
-    recommended_movies_details = [fetch_movie_details(movies.iloc[i[0]].title) for i in movies_list]
+    with stage('movies.recommend'):
+        titles = recommender.recommend(movie, num_recommendations)
+    with stage('movies.omdb_fetch_many'):
+        recommended_movies_details = metadata_client.fetch_many(titles)
     return [m for m in recommended_movies_details if m] # Filter out None values
 
 # ***************************** MAIN UI **********************************************************************
@@ -147,7 +154,8 @@ if selected_movie_name:
 
     if st.button('Show Recommendations'):
         with st.spinner('Finding similar movies for you...'):
-            recommendations = recommend(selected_movie_name, num_recommendations)
+            with profile_once('movies.recommend'):
+                recommendations = recommend(selected_movie_name, num_recommendations)
         
         st.markdown("---")
         st.subheader("Recommended For You")
@@ -0,0 +1,107 @@
+import os
+import pickle
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from neighbor_index import NeighborIndex, load_neighbor_index, save_neighbor_index, top_k
+from tags import read_tmdb
+
+# Adds new movies to an existing model without a full rebuild.
+#
+# The CountVectorizer vocabulary stays fixed, so old vectors never change and
+# neither does the similarity between two old movies. Only the m new rows of
+# the similarity matrix (m x (n + m)) have to be computed:
+#   * the new movies get their top-K from those rows directly,
+#   * every old movie merges its current top-K with its scores against the new
+#     movies, which gives exactly the top-K a full rebuild would produce.
+# Each block of new rows is merged into the running top-K of the old movies as
+# soon as it is computed, so no old x new matrix is ever held in memory.
+
+
+def extend_index(index, vectors, new_vectors, chunk_size=1024):
+    n, m = vectors.shape[0], new_vectors.shape[0]
+    k = index.k
+    all_vectors = sparse.vstack([vectors, new_vectors], format='csr')
+    normed = normalize(all_vectors)
+    normed_new = normed[n:]
+
+    # New movies x all movies, computed in chunks of new rows. Each block is also
+    # merged into the old movies' running top-K (chunked over old rows).
+    new_neighbors = np.empty((m, k), dtype=np.int32)
+    new_scores = np.empty((m, k), dtype=np.float32)
+    old_neighbors = index.neighbors.astype(np.int32, copy=True)
+    old_scores = index.scores.astype(np.float32, copy=True)
+
+    for start in range(0, m, chunk_size):
+        block = (normed_new[start:start + chunk_size] @ normed.T).toarray()
+        rows = np.arange(block.shape[0])
+        block_ids = np.arange(n + start, n + start + len(rows), dtype=np.int32)
+
+        for old_start in range(0, n, chunk_size):
+            old_stop = min(old_start + chunk_size, n)
+            ids = np.hstack([old_neighbors[old_start:old_stop], np.broadcast_to(block_ids, (old_stop - old_start, len(rows)))])
+            scores = np.hstack([old_scores[old_start:old_stop], block[:, old_start:old_stop].T.astype(np.float32)])
+            order, old_scores[old_start:old_stop] = top_k(scores, k)
+            old_neighbors[old_start:old_stop] = np.take_along_axis(ids, order, axis=1)
+
+        block[rows, n + start + rows] = -np.inf  # skip the movie itself
+        new_neighbors[start:start + len(rows)], new_scores[start:start + len(rows)] = top_k(block, k)
+
+    neighbors = np.vstack([old_neighbors, new_neighbors])
+    scores = np.vstack([old_scores, new_scores])
+    return NeighborIndex(neighbors, scores), all_vectors
+
+
+def add_movies(movies, vectors, index, cv, new_df):
+    # movies: current catalog (movie_id, title, tags), new_df: tags of the movies to add
+    new_df = new_df[~new_df['movie_id'].isin(movies['movie_id'])].drop_duplicates('movie_id')
+    if new_df.empty:
+        return movies, vectors, index, new_df
+
+    new_vectors = sparse.csr_matrix(cv.transform(new_df['tags']))
+    index, vectors = extend_index(index, sparse.csr_matrix(vectors), new_vectors)
+
+    start = movies.index.max() + 1 if len(movies) else 0
+    new_df = new_df.set_axis(range(start, start + len(new_df)))
+    movies = pd.concat([movies, new_df[movies.columns]])
+    return movies, vectors, index, new_df
+
+
+def _replace(path, write):
+    # Write next to the target, then swap it in, so readers never see a half written file.
+    tmp = f'{path}.tmp'
+    with open(tmp, 'wb') as f:
+        write(f)
+    os.replace(tmp, path)
+
+
+# --- CLI: python incremental.py new_movies.csv new_credits.csv ---
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Append new movies to the recommender without a full rebuild.")
+    parser.add_argument('movies_csv', help="new movies, same columns as tmdb_5000_movies.csv")
+    parser.add_argument('credits_csv', help="their credits, same columns as tmdb_5000_credits.csv")
+    parser.add_argument('--catalog', default='movies_dict.pkl')
+    parser.add_argument('--vectors', default='vectors.npz')
+    parser.add_argument('--index', default='neighbors.npz')
+    parser.add_argument('--vectorizer', default='count_vectorizer.pkl')
+    args = parser.parse_args()
+
+    movies = pd.DataFrame(pickle.load(open(args.catalog, 'rb')))
+    vectors = sparse.load_npz(args.vectors)
+    index = load_neighbor_index(args.index)
+    cv = pickle.load(open(args.vectorizer, 'rb'))
+
+    movies, vectors, index, added = add_movies(movies, vectors, index, cv, read_tmdb(args.movies_csv, args.credits_csv))
+
+    if added.empty:
+        print("No new movies to add.")
+    else:
+        _replace(args.vectors, lambda f: sparse.save_npz(f, vectors))
+        _replace(args.index, lambda f: save_neighbor_index(index, f))
+        _replace(args.catalog, lambda f: pickle.dump(movies.to_dict(), f))
+        print(f"Added {len(added)} movies, catalog now has {len(movies)}.")
@@ -0,0 +1,155 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from requests.adapters import HTTPAdapter
+
+OMDB_URL = "http://www.omdbapi.com/"
+NO_POSTER = "https://via.placeholder.com/500x750.png?text=No+Poster"
+
+_MISSING = object()
+
+
+# --- In-memory LRU cache with expiry ---
+class TTLCache:
+    def __init__(self, maxsize=1024, ttl=24 * 3600):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return _MISSING
+            expires_at, value = item
+            if expires_at < time.time():
+                del self._data[key]
+                return _MISSING
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        with self._lock:
+            self._data[key] = (time.time() + (self.ttl if ttl is None else ttl), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def __len__(self):
+        return len(self._data)
+
+
+# --- On-disk cache (SQLite, shared by every process on the host) ---
+class DiskCache:
+    # Best effort: when another process holds the write lock past the timeout,
+    # sqlite raises OperationalError ("database is locked"); that read counts
+    # as a miss and that write is skipped, instead of failing the lookup.
+
+    def __init__(self, path, ttl=7 * 24 * 3600, timeout=1.0):
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, timeout=timeout, check_same_thread=False)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS movies (title TEXT PRIMARY KEY, expires_at REAL, data TEXT)")
+        self._conn.commit()
+
+    def get(self, key):
+        with self._lock:
+            try:
+                row = self._conn.execute("SELECT expires_at, data FROM movies WHERE title = ?", (key,)).fetchone()
+            except sqlite3.OperationalError:
+                return _MISSING
+        if row is None or row[0] < time.time():
+            return _MISSING
+        return json.loads(row[1])
+
+    def set(self, key, value, ttl=None):
+        expires_at = time.time() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            try:
+                self._conn.execute("INSERT OR REPLACE INTO movies VALUES (?, ?, ?)", (key, expires_at, json.dumps(value)))
+                self._conn.commit()
+            except sqlite3.OperationalError:
+                self._conn.rollback()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+# --- OMDb client ---
+def parse_movie_details(data):
+    if data.get('Response') != 'True':
+        return None
+    poster = data.get('Poster', NO_POSTER)
+    if poster == 'N/A': poster = NO_POSTER
+    return {"title": data.get('Title'), "year": data.get('Year'), "plot": data.get('Plot'), "poster": poster}
+
+
+class MovieMetadataClient:
+    # Fetches OMDb details for many titles at once over a pooled session.
+    # Lookups go memory cache -> disk cache -> network; found answers are cached
+    # for `ttl`, not-found answers only for `negative_ttl` (OMDb may add the
+    # title, or the miss was a transient glitch), network errors not at all.
+
+    def __init__(self, api_key, base_url=OMDB_URL, timeout=5.0, max_workers=8,
+                 cache_size=1024, ttl=7 * 24 * 3600, negative_ttl=3600, cache_path='omdb_cache.sqlite'):
+        self.api_key = api_key
+        self.base_url = base_url
+        self.timeout = timeout
+        self.negative_ttl = negative_ttl
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=max_workers)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='omdb')
+
+        self.memory = TTLCache(cache_size, ttl)
+        self.disk = DiskCache(cache_path, ttl) if cache_path else None
+
+    def _cached(self, title):
+        value = self.memory.get(title)
+        if value is _MISSING and self.disk is not None:
+            value = self.disk.get(title)
+            if value is not _MISSING:
+                self.memory.set(title, value, self._ttl(value))
+        return value
+
+    def _ttl(self, details):
+        return self.negative_ttl if details is None else None  # None: the cache's own ttl
+
+    def _download(self, title):
+        try:
+            response = self.session.get(self.base_url, params={'t': title, 'apikey': self.api_key}, timeout=self.timeout)
+            response.raise_for_status()
+            details = parse_movie_details(response.json())
+        except (requests.exceptions.RequestException, ValueError):
+            return None
+
+        self.memory.set(title, details, self._ttl(details))
+        if self.disk is not None:
+            self.disk.set(title, details, self._ttl(details))
+        return details
+
+    def fetch(self, title):
+        value = self._cached(title)
+        return self._download(title) if value is _MISSING else value
+
+    def fetch_many(self, titles):
+        results = {title: self._cached(title) for title in titles}
+        missing = [title for title, value in results.items() if value is _MISSING]
+        for title, details in zip(missing, self.executor.map(self._download, missing)):
+            results[title] = details
+        return [results[title] for title in titles]
+
+    def close(self):
+        self.executor.shutdown(wait=False)
+        self.session.close()
+        if self.disk is not None:
+            self.disk.close()
@@ -0,0 +1,108 @@
+from typing import NamedTuple
+
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+# Number of neighbours kept per movie. The app shows at most 9, the rest is headroom.
+DEFAULT_K = 20
+
+
+class NeighborIndex(NamedTuple):
+    neighbors: np.ndarray  # (n_movies, k) int32 row ids, most similar first
+    scores: np.ndarray     # (n_movies, k) float32 cosine similarities
+
+    @property
+    def k(self):
+        return self.neighbors.shape[1]
+
+    def lookup(self, row, n):
+        return self.neighbors[row, :n], self.scores[row, :n]
+
+
+# --- Top-K selection ---
+def top_k(scores, k):
+    # argpartition finds the k best columns of every row in linear time, only
+    # those k are then sorted (best first).
+    if k < scores.shape[1]:
+        candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        candidates = np.broadcast_to(np.arange(scores.shape[1]), scores.shape)
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1, kind='stable')
+    return np.take_along_axis(candidates, order, axis=1), np.take_along_axis(candidate_scores, order, axis=1)
+
+
+# --- Build ---
+def _top_k_block(block, start, k):
+    rows = np.arange(block.shape[0])
+    block[rows, start + rows] = -np.inf  # a movie is not its own recommendation
+    return top_k(block, k)
+
+
+def build_neighbor_index(vectors, k=DEFAULT_K, chunk_size=1024):
+    # Cosine similarity is computed one block of rows at a time, so the full
+    # n x n matrix never has to exist in memory.
+    normed = normalize(vectors)
+    n = normed.shape[0]
+    k = min(k, n - 1)
+
+    neighbors = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float32)
+
+    for start in range(0, n, chunk_size):
+        block = normed[start:start + chunk_size] @ normed.T
+        block = block.toarray() if sparse.issparse(block) else np.array(block, dtype=np.float64)
+        stop = start + block.shape[0]
+        neighbors[start:stop], scores[start:stop] = _top_k_block(block, start, k)
+
+    return NeighborIndex(neighbors, scores)
+
+
+def build_neighbor_index_from_similarity(similarity, k=DEFAULT_K, chunk_size=1024):
+    # For an already computed dense similarity matrix (e.g. an old similarity.pkl).
+    n = similarity.shape[0]
+    k = min(k, n - 1)
+
+    neighbors = np.empty((n, k), dtype=np.int32)
+    scores = np.empty((n, k), dtype=np.float32)
+
+    for start in range(0, n, chunk_size):
+        block = np.array(similarity[start:start + chunk_size], dtype=np.float64)
+        stop = start + block.shape[0]
+        neighbors[start:stop], scores[start:stop] = _top_k_block(block, start, k)
+
+    return NeighborIndex(neighbors, scores)
+
+
+# --- Save / Load ---
+def save_neighbor_index(index, path):
+    # `path` may also be an open binary file.
+    if hasattr(path, 'write'):
+        np.savez(path, neighbors=index.neighbors, scores=index.scores)
+        return
+    with open(path, 'wb') as f:
+        np.savez(f, neighbors=index.neighbors, scores=index.scores)
+
+
+def load_neighbor_index(path, loader=None):
+    # loader: path -> {'neighbors', 'scores'}, e.g. mmap_artifacts.load_artifact for neighbors.mmap/
+    if loader is not None:
+        data = loader(path)
+        return NeighborIndex(data['neighbors'], data['scores'])
+    with np.load(path) as data:
+        return NeighborIndex(data['neighbors'], data['scores'])
+
+
+def load_vectors(path, loader=None):
+    # Term vectors saved with sparse.save_npz (vectors.npz).
+    # loader: path -> {'data', 'indices', 'indptr', 'format', 'shape'}, e.g. mmap_artifacts.load_artifact
+    if loader is None:
+        return sparse.load_npz(path)
+    data = loader(path)
+    matrix_format = data['format'].item()
+    matrix_format = matrix_format.decode() if isinstance(matrix_format, bytes) else matrix_format
+    matrices = {'csr': sparse.csr_matrix, 'csc': sparse.csc_matrix}
+    if matrix_format not in matrices:
+        raise ValueError(f"{path}: unsupported sparse format {matrix_format!r}, expected csr or csc")
+    return matrices[matrix_format]((data['data'], data['indices'], data['indptr']), shape=tuple(data['shape']))
@@ -0,0 +1,104 @@
+import numpy as np
+from scipy import sparse
+from sklearn.preprocessing import normalize
+
+from neighbor_index import top_k
+
+
+class Recommender:
+    # Serves recommendations from the precomputed NeighborIndex (fast, limited
+    # to its K), from an approximate IVFIndex (large catalogs, see ann_index.py)
+    # or from the term vectors (exact, any K, one matrix product per batch).
+
+    def __init__(self, titles, index=None, vectors=None, ann=None):
+        if index is None and vectors is None and ann is None:
+            raise ValueError("Recommender needs a neighbour index, an ANN index or term vectors.")
+
+        self.titles = np.asarray(titles, dtype=object)
+        self.index = index
+        self.ann = ann
+        self.vectors = normalize(vectors).astype(np.float32) if vectors is not None else None
+
+        # Title -> row, built once. The first occurrence wins, like `.index[0]` did.
+        self.rows = {}
+        for row, title in enumerate(self.titles):
+            self.rows.setdefault(title, row)
+
+    def row_of(self, title):
+        try:
+            return self.rows[title]
+        except KeyError:
+            raise KeyError(f"Unknown movie title: {title!r}") from None
+
+    # --- Single title ---
+    def recommend(self, movie, num_recommendations=5):
+        return self.recommend_many([movie], num_recommendations)[0]
+
+    # --- Batch ---
+    def neighbors_many(self, rows, k, chunk_size=1024):
+        rows = np.asarray(rows, dtype=np.int64)
+
+        if self.index is not None and k <= self.index.k:
+            return self.index.neighbors[rows, :k], self.index.scores[rows, :k]
+
+        if self.ann is not None:
+            return self.ann.search(rows, k)
+
+        if self.vectors is None:
+            raise ValueError(f"k={k} is larger than the neighbour index (K={self.index.k}) and no vectors are loaded.")
+
+        k = min(k, self.vectors.shape[0] - 1)
+        neighbors = np.empty((len(rows), k), dtype=np.int32)
+        scores = np.empty((len(rows), k), dtype=np.float32)
+
+        for start in range(0, len(rows), chunk_size):
+            batch = rows[start:start + chunk_size]
+            block = self.vectors[batch] @ self.vectors.T
+            block = block.toarray() if sparse.issparse(block) else np.asarray(block)
+            block[np.arange(len(batch)), batch] = -np.inf  # skip the movie itself
+            neighbors[start:start + len(batch)], scores[start:start + len(batch)] = top_k(block, k)
+
+        return neighbors, scores
+
+    def recommend_many(self, titles, k=5):
+        rows = [self.row_of(title) for title in titles]
+        neighbors, _ = self.neighbors_many(rows, k)
+        return [self.titles[row[row >= 0]].tolist() for row in neighbors]  # ANN rows may come back short (-1)
+
+
+# --- Nightly "similar titles" export: python recommender.py --k 10 --out similar_titles.csv ---
+if __name__ == '__main__':
+    import argparse
+    import pickle
+
+    import pandas as pd
+
+    from ann_index import load_ivf_index
+    from neighbor_index import load_neighbor_index
+
+    parser = argparse.ArgumentParser(description="Precompute similar titles for the whole catalog.")
+    parser.add_argument('--k', type=int, default=10)
+    parser.add_argument('--movies', default='movies_dict.pkl')
+    parser.add_argument('--index', default='neighbors.npz', help="pass '' to skip the precomputed index")
+    parser.add_argument('--vectors', default=None, help="vectors.npz, needed when --k is above the index K")
+    parser.add_argument('--ann', default=None, help="ivf.npz from ann_index.py, approximate search (needs --vectors)")
+    parser.add_argument('--nprobe', type=int, default=None, help="override the ANN index nprobe")
+    parser.add_argument('--out', default='similar_titles.csv')
+    args = parser.parse_args()
+
+    movies = pd.DataFrame(pickle.load(open(args.movies, 'rb')))
+    vectors = sparse.load_npz(args.vectors) if args.vectors else None
+    ann = load_ivf_index(args.ann, vectors) if args.ann else None
+    if ann is not None and args.nprobe:
+        ann.nprobe = args.nprobe
+    index = load_neighbor_index(args.index) if args.index else None
+    recommender = Recommender(movies['title'].values, index=index, vectors=vectors, ann=ann)
+
+    neighbors, scores = recommender.neighbors_many(np.arange(len(movies)), args.k)
+    out = pd.DataFrame({
+        'title': recommender.titles,
+        'similar_titles': ['|'.join(recommender.titles[row[row >= 0]]) for row in neighbors],
+        'scores': ['|'.join(f'{s:.4f}' for s in row) for row in scores],
+    })
+    out.to_csv(args.out, index=False)
+    print(f"Wrote {len(out)} rows to {args.out}")
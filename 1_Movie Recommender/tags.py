@@ -0,0 +1,66 @@
+import json
+from functools import lru_cache
+
+import pandas as pd
+from nltk.stem.porter import PorterStemmer
+
+try:
+    import orjson
+    loads = orjson.loads
+except ImportError:  # orjson is optional, the stdlib parser gives the same result
+    loads = json.loads
+
+# Same feature extraction as code.ipynb, packaged so that tags can be built
+# outside the notebook (incremental.py, build_model.py). Every JSON column is
+# parsed exactly once per movie.
+
+ps = PorterStemmer()
+
+
+def names(obj, limit=None):
+    # convert() / convert3() in the notebook
+    items = loads(obj) if isinstance(obj, (str, bytes)) else obj
+    return [i['name'] for i in items[:limit]]
+
+
+def director(obj):
+    # fetch_director() in the notebook
+    items = loads(obj) if isinstance(obj, (str, bytes)) else obj
+    for i in items:
+        if i['job'] == 'Director':
+            return [i['name']]
+    return []
+
+
+def make_tags(overview, genres, keywords, cast, crew):
+    # overview: raw text, the other arguments: lists of names
+    words = overview.split()
+    for group in (genres, keywords, cast, crew):
+        words.extend(i.replace(" ", "") for i in group)
+    return " ".join(words).lower()
+
+
+@lru_cache(maxsize=200_000)
+def stem_word(word):
+    return ps.stem(word)
+
+
+def stem(text):
+    return " ".join(stem_word(i) for i in text.split())
+
+
+def build_tags(movies, credits):
+    # tmdb_5000_movies.csv / tmdb_5000_credits.csv shaped frames -> (movie_id, title, tags)
+    movies = movies.merge(credits, on='title')
+    movies = movies[['movie_id', 'title', 'overview', 'genres', 'keywords', 'cast', 'crew']].dropna()
+
+    tags = [
+        stem(make_tags(overview, names(genres), names(keywords), names(cast, 3), director(crew)))
+        for overview, genres, keywords, cast, crew in zip(
+            movies['overview'], movies['genres'], movies['keywords'], movies['cast'], movies['crew'])
+    ]
+    return pd.DataFrame({'movie_id': movies['movie_id'].values, 'title': movies['title'].values, 'tags': tags})
+
+
+def read_tmdb(movies_csv, credits_csv):
+    return build_tags(pd.read_csv(movies_csv), pd.read_csv(credits_csv))
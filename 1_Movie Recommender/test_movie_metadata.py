@@ -0,0 +1,122 @@
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from movie_metadata import _MISSING, DiskCache, MovieMetadataClient, NO_POSTER
+
+# MovieMetadataClient against a local stub of the OMDb API: connection reuse,
+# expiry of cached answers, short-lived caching of not-found answers, and a
+# locked disk cache.
+#
+#   python -m unittest test_movie_metadata -v
+
+MOVIES = {'Avatar': {'Response': 'True', 'Title': 'Avatar', 'Year': '2009', 'Plot': 'Pandora.', 'Poster': 'N/A'},
+          'Titanic': {'Response': 'True', 'Title': 'Titanic', 'Year': '1997', 'Plot': 'Ship.', 'Poster': 'p.jpg'}}
+
+
+class StubOMDb(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # keep-alive, as OMDb
+
+    def do_GET(self):
+        title = parse_qs(urlparse(self.path).query)['t'][0]
+        self.server.requests.append((title, self.client_address[1]))
+        body = json.dumps(MOVIES.get(title, {'Response': 'False', 'Error': 'Movie not found!'})).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class MovieMetadataClientTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), StubOMDb)
+        self.server.requests = []  # (title, client port) per request
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.directory = tempfile.TemporaryDirectory()
+        self.clients = []
+
+    def tearDown(self):
+        for client in self.clients:
+            client.close()
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def client(self, **kwargs):
+        kwargs.setdefault('cache_path', os.path.join(self.directory.name, 'omdb_cache.sqlite'))
+        client = MovieMetadataClient('key', base_url=f'http://127.0.0.1:{self.server.server_port}/', **kwargs)
+        self.clients.append(client)
+        return client
+
+    def titles_requested(self):
+        return [title for title, _ in self.server.requests]
+
+    def test_pooled_session_reuses_connections(self):
+        client = self.client(max_workers=1, cache_path=None)
+        for title in ['Avatar', 'Titanic', 'Unknown']:
+            client.fetch(title)
+        client.fetch_many(['Avatar', 'Brazil', 'Heat'])
+        self.assertEqual(self.titles_requested(), ['Avatar', 'Titanic', 'Unknown', 'Brazil', 'Heat'])
+        self.assertEqual(len({port for _, port in self.server.requests}), 1)  # one keep-alive connection
+
+    def test_details_parsed_and_cached(self):
+        client = self.client()
+        details = client.fetch_many(['Avatar', 'Titanic', 'Avatar'])
+        self.assertEqual(details[0], {'title': 'Avatar', 'year': '2009', 'plot': 'Pandora.', 'poster': NO_POSTER})
+        self.assertEqual(details[1]['poster'], 'p.jpg')
+        client.fetch('Avatar')
+        self.assertEqual(sorted(self.titles_requested()), ['Avatar', 'Titanic'])
+
+        # a second process on the host finds them in the shared disk cache
+        self.client().fetch_many(['Avatar', 'Titanic'])
+        self.assertEqual(len(self.server.requests), 2)
+
+    def test_ttl_expiry(self):
+        client = self.client(ttl=0.3)
+        client.fetch('Avatar')
+        client.fetch('Avatar')
+        self.assertEqual(self.titles_requested(), ['Avatar'])
+        time.sleep(0.4)
+        self.assertEqual(client.fetch('Avatar')['title'], 'Avatar')
+        self.assertEqual(self.titles_requested(), ['Avatar', 'Avatar'])
+
+    def test_not_found_cached_briefly(self):
+        client = self.client(ttl=60, negative_ttl=0.3)
+        self.assertIsNone(client.fetch('Unknown'))
+        self.assertIsNone(client.fetch('Unknown'))
+        client.fetch('Avatar')
+        self.assertEqual(self.titles_requested(), ['Unknown', 'Avatar'])
+        time.sleep(0.4)
+        client.fetch_many(['Unknown', 'Avatar'])  # only the not-found answer has expired
+        self.assertEqual(self.titles_requested(), ['Unknown', 'Avatar', 'Unknown'])
+
+    def test_locked_disk_cache_is_a_miss(self):
+        path = os.path.join(self.directory.name, 'omdb_cache.sqlite')
+        client = self.client(cache_path=path)
+        client.disk.close()
+        client.disk = DiskCache(path, timeout=0.05)
+
+        writer = sqlite3.connect(path)
+        writer.execute('BEGIN EXCLUSIVE')  # another process in the middle of a write
+        try:
+            self.assertIs(client.disk.get('Avatar'), _MISSING)
+            self.assertEqual(client.fetch('Avatar')['title'], 'Avatar')  # the failed cache write doesn't fail the fetch
+        finally:
+            writer.rollback()
+            writer.close()
+        self.assertEqual(len(self.server.requests), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,40 +1,43 @@
+import os
+import sys
+from pathlib import Path
 import streamlit as st
-import pickle
-import nltk
-from nltk.stem.porter import PorterStemmer
-from nltk.corpus import stopwords
-import string
+from model_registry import get_registry
+from online_spam import HotSwapModel
+from text_preprocessing import transform_text # Shared with Code.ipynb
+from verdict_cache import VerdictCache
 
-# ------------------------- Load Data -------------------------
-tfidf = pickle.load(open('vectorizer.pkl', 'rb'))
-model = pickle.load(open('model.pkl', 'rb'))
-ps = PorterStemmer()
-
-# ------------------------- Preprocessing -------------------------
-def transform_text(text):
-    text = text.lower()
-    text = nltk.word_tokenize(text) # Tokenization
-
-    y = []
-    for i  in text:
-        if i.isalnum():
-            y.append(i)  # Removing special characters
-
-    text = y[:]
-    y.clear()
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'common'))
+from instrumentation import count, profile_once, stage, timed # Stage timings, see common/instrumentation.py
+from mmap_artifacts import load_artifact # Memory-mapped .mmap artifacts when converted, else the pickles
 
-    # Removing stopwords & punctuation
-    for i in text:
-        if (i not in stopwords.words('english')) and (i not in string.punctuation):
-            y.append(i)
+# ------------------------- Load Data -------------------------
+@st.cache_resource
+@timed('spam.load_registry')
+def load_registry():
+    # Unpickled and NLTK-warmed once per process, not on every rerun
+    return get_registry('vectorizer.pkl', 'model.pkl', loader=load_artifact)
 
-    text = y[:]
-    y.clear()
+@st.cache_resource
+def load_online_model(path):
+    # The incrementally trained model of online_spam.py; new checkpoints are swapped in without a restart
+    return HotSwapModel(path)
 
-    for i in text:
-        y.append(ps.stem(i))
+@st.cache_resource
+def load_verdict_cache(_registry):
+    # One per process: verdicts of messages seen before (and of their near duplicates)
+    return VerdictCache(_registry.tfidf, _registry.model, stage=stage)
 
-    return " ".join(y)
+registry = load_registry()
+online = load_online_model(os.environ['SPAM_ONLINE_MODEL']) if os.environ.get('SPAM_ONLINE_MODEL') else None
+if online is not None:
+    current = online.current()
+    tfidf, model = current.vectorizer, current.model
+else:
+    tfidf = registry.tfidf
+    model = registry.model
+verdict_cache = load_verdict_cache(registry)
+verdict_cache.set_model(tfidf, model)  # a new online checkpoint starts an empty cache
 
 # ------------------------- Custom CSS ----------------------------------------
 st.markdown("""
@@ -96,15 +99,38 @@ if st.button("🚀 Predict"):
         st.warning("⚠️ Please enter a message before predicting.")
     else:
         # Preprocess and predict
-        transformed_sms = transform_text(input_sms)
-        vector_input = tfidf.transform([transformed_sms])
-        result = model.predict(vector_input)[0]
+        with profile_once('spam.predict'):
+            with stage('spam.transform_text'):
+                transformed_sms = transform_text(input_sms)
+            # tfidf + model (timed as spam.tfidf_transform / spam.model_predict), unless this
+            # message or a near duplicate was classified before
+            with stage('spam.verdict_cache'):
+                result, hit = verdict_cache.predict(transformed_sms)
+            count('spam.cache_hit' if hit else 'spam.cache_miss')
 
         if result == 1:
             st.markdown('<div class="result-card spam">🚫 This message is <b>SPAM</b>!</div>', unsafe_allow_html=True)
         else:
             st.markdown('<div class="result-card not-spam">✅ This message is <b>NOT SPAM</b>!</div>', unsafe_allow_html=True)
 
+        stats = verdict_cache.stats()
+        st.caption(f"Verdict cache: {stats['hits']} exact and {stats['near_hits']} near-duplicate hits, "
+                   f"{stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), {stats['size']:,} messages cached.")
+
+# ------------------------- Model Info ------------------------------------------
+with st.expander("⚙️ Model loading metrics"):
+    for name, stats in registry.metrics().items():
+        if 'load_seconds' in stats:
+            memory = '' if stats['memory_bytes'] is None else f"{stats['memory_bytes'] / 1e6:.2f} MB in memory "
+            st.write(f"**{name}** — loaded in {stats['load_seconds'] * 1000:.1f} ms, "
+                     f"{memory}({stats['file_bytes'] / 1e6:.2f} MB on disk)")
+        else:
+            st.write(f"**{name}** — {stats['seconds'] * 1000:.1f} ms")
+    if online is not None:
+        info = online.metrics()
+        st.write(f"**online model** ({info['path']}) — {info['classifier']}, trained on {info['seen']:,} messages "
+                 f"in {info['batches']} batches, {info['reloads']} checkpoint reloads")
+
 # ------------------------- Footer ------------------------------------------
 st.markdown("""
 <hr>
@@ -0,0 +1,118 @@
+import os
+import pickle
+import threading
+import time
+import tracemalloc
+
+import nltk
+
+import text_preprocessing
+from text_preprocessing import transform_text
+
+# Loads the spam artifacts once per process and keeps them warm.
+#
+# Streamlit reruns frontend.py on every interaction; the registry (held with
+# st.cache_resource) makes sure vectorizer.pkl / model.pkl are unpickled only
+# the first time, and that NLTK's tokenizer, stopwords and stemmer are loaded
+# at startup instead of on the first message.
+#
+# Each artifact's load time is recorded with its memory footprint, by default
+# as the change in resident memory (Linux; None elsewhere). ML_TRACE_MEMORY=1
+# (or trace_memory=True) measures Python allocations with tracemalloc instead:
+# exact, but it slows the load down, so it is not used on the normal start-up path.
+
+TRACE_MEMORY = os.environ.get('ML_TRACE_MEMORY', '').lower() in ('1', 'true', 'yes', 'on')
+
+
+def _rss_bytes():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, AttributeError):  # not Linux
+        return None
+
+
+class ModelRegistry:
+
+    def __init__(self, vectorizer_path='vectorizer.pkl', model_path='model.pkl', loader=None, trace_memory=None):
+        # loader: path -> artifact, e.g. mmap_artifacts.load_artifact; default pickle.load
+        self.paths = {'vectorizer': vectorizer_path, 'model': model_path}
+        self.loader = loader
+        self.trace_memory = TRACE_MEMORY if trace_memory is None else trace_memory
+        self.artifacts = {}
+        self.stats = {}
+        self._lock = threading.Lock()
+
+    # --- Loading ---
+    def _load_artifact(self, name):
+        path = self.paths[name]
+        tracing = self.trace_memory and tracemalloc.is_tracing()  # someone else's trace: read it, don't reset or stop it
+        if self.trace_memory and not tracing:
+            tracemalloc.start()
+        base = tracemalloc.get_traced_memory()[0] if self.trace_memory else _rss_bytes()
+
+        start = time.perf_counter()
+        if self.loader is not None:
+            artifact = self.loader(path)
+        else:
+            with open(path, 'rb') as f:
+                artifact = pickle.load(f)
+        seconds = time.perf_counter() - start
+
+        if self.trace_memory:
+            current, peak = tracemalloc.get_traced_memory()
+            memory = (current if tracing else peak) - base
+            if not tracing:
+                tracemalloc.stop()
+        else:
+            rss = _rss_bytes()
+            memory = None if rss is None or base is None else rss - base
+
+        self.stats[name] = {'path': path, 'file_bytes': os.path.getsize(path),
+                            'load_seconds': seconds, 'memory_bytes': memory}
+        return artifact
+
+    def load(self):
+        with self._lock:
+            if not self.artifacts:
+                self.artifacts = {name: self._load_artifact(name) for name in self.paths}
+        return self
+
+    def warm_up(self):
+        # First calls into NLTK load the punkt tables; the stem cache gets a few entries.
+        start = time.perf_counter()
+        nltk.word_tokenize("Warming up the tokenizer. Second sentence!")
+        transform_text("Congratulations, you have been selected to receive a free prize")
+        self.stats['nltk_warm_up'] = {'seconds': time.perf_counter() - start,
+                                      'stopwords': len(text_preprocessing.STOPWORDS)}
+        return self
+
+    @property
+    def tfidf(self):
+        return self.load().artifacts['vectorizer']
+
+    @property
+    def model(self):
+        return self.load().artifacts['model']
+
+    # --- Prediction ---
+    def predict(self, text):
+        vector_input = self.tfidf.transform([transform_text(text)])
+        return self.model.predict(vector_input)[0]
+
+    def metrics(self):
+        return dict(self.stats)
+
+
+_registries = {}
+_registry_lock = threading.Lock()
+
+
+def get_registry(vectorizer_path='vectorizer.pkl', model_path='model.pkl', loader=None):
+    # Process-wide registry per set of artifacts, loaded and warmed on first use:
+    # a caller asking for other files (or another loader) gets its own registry.
+    key = (os.path.abspath(vectorizer_path), os.path.abspath(model_path), loader)
+    with _registry_lock:
+        if key not in _registries:
+            _registries[key] = ModelRegistry(vectorizer_path, model_path, loader).load().warm_up()
+        return _registries[key]
@@ -0,0 +1,143 @@
+import argparse
+import itertools
+import json
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from model_registry import ModelRegistry
+from text_preprocessing import transform_text
+
+# Bulk scoring for the spam classifier.
+#
+# Messages are read as a stream in fixed-size batches. Preprocessing of a batch
+# is fanned out over a process pool (the next batch is already being
+# preprocessed while the current one is scored), then the whole batch goes
+# through tfidf.transform and the model in a single call on a sparse matrix.
+#
+#   python spam_batch.py messages.csv --text-column text -o predictions.csv
+#   python spam_batch.py messages.jsonl -o predictions.jsonl
+#   cat messages.txt | python spam_batch.py - --format text > predictions.jsonl
+
+
+# --- Readers: every reader yields DataFrames of at most `batch_size` rows with a text column ---
+def read_csv(source, text_column, batch_size, encoding):
+    yield from pd.read_csv(source, chunksize=batch_size, encoding=encoding, dtype={text_column: str})
+
+
+def read_jsonl(source, batch_size):
+    lines = (line for line in source if line.strip())
+    while batch := list(itertools.islice(lines, batch_size)):
+        yield pd.DataFrame([json.loads(line) for line in batch])
+
+
+def read_text(source, batch_size):
+    lines = (line.rstrip("\n") for line in source)
+    while batch := list(itertools.islice(lines, batch_size)):
+        yield pd.DataFrame({'text': batch})
+
+
+def guess_format(path):
+    if path == '-':
+        return 'text'
+    return {'.csv': 'csv', '.jsonl': 'jsonl', '.json': 'jsonl'}.get(os.path.splitext(path)[1].lower(), 'text')
+
+
+# --- Scoring ---
+def score_batch(tfidf, model, transformed):
+    vectors = tfidf.transform(transformed)  # sparse, one call per batch
+    if not hasattr(model, 'predict_proba'):
+        return model.predict(vectors), None
+    proba = model.predict_proba(vectors)  # the model is evaluated once: labels are the most probable class
+    return model.classes_[proba.argmax(axis=1)], proba[:, 1]
+
+
+def score_stream(batches, tfidf, model, text_column='text', workers=None):
+    # Yields the input batches with `prediction`, `label` and `spam_probability` columns added.
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def preprocess(batch):
+            texts = batch[text_column].fillna('').astype(str).tolist()
+            return executor.map(transform_text, texts, chunksize=max(1, len(texts) // (workers * 4)))
+
+        batches = iter(batches)
+        current = next(batches, None)
+        pending = preprocess(current) if current is not None else None
+        while current is not None:
+            upcoming = next(batches, None)
+            upcoming_pending = preprocess(upcoming) if upcoming is not None else None  # overlaps with scoring below
+
+            predictions, probabilities = score_batch(tfidf, model, list(pending))
+            current = current.assign(prediction=predictions, label=['spam' if p == 1 else 'ham' for p in predictions])
+            if probabilities is not None:
+                current['spam_probability'] = probabilities
+            yield current
+
+            current, pending = upcoming, upcoming_pending
+
+
+# --- Writers ---
+def write_csv(batches, out):
+    for i, batch in enumerate(batches):
+        batch.to_csv(out, index=False, header=(i == 0))
+        yield len(batch)
+
+
+def write_jsonl(batches, out):
+    for batch in batches:
+        if not batch.empty:
+            lines = batch.to_json(orient='records', lines=True, force_ascii=False)
+            out.write(lines if lines.endswith("\n") else lines + "\n")  # older pandas omit the last newline
+        yield len(batch)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Score a file or stream of messages with the spam model.")
+    parser.add_argument('input', help="CSV, JSONL or text file (one message per line); '-' reads stdin")
+    parser.add_argument('-o', '--output', default='-', help="output file (.csv or .jsonl); '-' writes JSONL to stdout")
+    parser.add_argument('--format', choices=['csv', 'jsonl', 'text'], default=None, help="input format (default: from extension)")
+    parser.add_argument('--text-column', default='text', help="column/field holding the message (spam.csv uses v2)")
+    parser.add_argument('--encoding', default='utf-8', help="CSV encoding (spam.csv is ISO-8859-1)")
+    parser.add_argument('--batch-size', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=None, help="preprocessing processes (default: all cores)")
+    parser.add_argument('--vectorizer', default='vectorizer.pkl')
+    parser.add_argument('--model', default='model.pkl')
+    args = parser.parse_args()
+
+    registry = ModelRegistry(args.vectorizer, args.model).load()
+    tfidf, model = registry.tfidf, registry.model
+
+    fmt = args.format or guess_format(args.input)
+    if args.input == '-':
+        source = sys.stdin
+    elif fmt == 'csv':
+        source = args.input  # pandas opens it with --encoding
+    else:
+        source = open(args.input, encoding='utf-8')
+
+    if fmt == 'csv':
+        batches = read_csv(source, args.text_column, args.batch_size, args.encoding)
+    elif fmt == 'jsonl':
+        batches = read_jsonl(source, args.batch_size)
+    else:
+        batches = read_text(source, args.batch_size)
+    text_column = 'text' if fmt == 'text' else args.text_column
+
+    out = sys.stdout if args.output == '-' else open(args.output, 'w', encoding='utf-8', newline='')
+    writer = write_csv if args.output.lower().endswith('.csv') else write_jsonl
+
+    start, total = time.perf_counter(), 0
+    for n in writer(score_stream(batches, tfidf, model, text_column, args.workers), out):
+        total += n
+        elapsed = time.perf_counter() - start
+        print(f"{total} messages, {total / elapsed:,.0f} msg/s", file=sys.stderr)
+
+    if out is not sys.stdout:
+        out.close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,30 @@
+import string
+from functools import lru_cache
+
+import nltk
+from nltk.corpus import stopwords
+from nltk.stem.porter import PorterStemmer
+
+# Shared by frontend.py and Code.ipynb. Produces exactly the same output as the
+# original transform_text(), just without the per-token overhead:
+#   * stopwords.words('english') was re-read (and linearly scanned) for every
+#     token, now it is a frozenset built once,
+#   * the three list copies are now a single filtering pass,
+#   * stems are memoized, messages reuse a small vocabulary.
+
+ps = PorterStemmer()
+
+STOPWORDS = frozenset(stopwords.words('english'))
+PUNCTUATION = frozenset(string.punctuation)
+SKIP = STOPWORDS | PUNCTUATION
+
+
+@lru_cache(maxsize=100_000)
+def stem(token):
+    return ps.stem(token)
+
+
+def transform_text(text):
+    # lowercase -> tokenize -> keep alphanumeric tokens -> drop stopwords & punctuation -> stem
+    return " ".join(stem(token) for token in nltk.word_tokenize(text.lower())
+                    if token.isalnum() and token not in SKIP)
@@ -0,0 +1,199 @@
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import nullcontext
+from functools import lru_cache
+
+import numpy as np
+
+# LRU cache of spam verdicts, with near-duplicate matching.
+#
+# Spam campaigns send the same text, or the same text with a name, a number or
+# a word changed, thousands of times. Verdicts are cached under a digest of the
+# transformed text (transform_text output, so case, punctuation, stopwords and
+# word endings are already normalized away); an exact hit skips tfidf.transform
+# and the model. A message that misses is looked up by the MinHash signature of
+# its set of words: a cached message whose estimated Jaccard similarity is at
+# least `threshold` is a near duplicate, and its verdict is reused.
+#
+# Signatures are indexed by bands (LSH: 16 bands of 4 hashes), so a lookup only
+# compares the few entries sharing a band with the message instead of the whole
+# cache. Only verdicts the model produced are indexed, so variants of variants
+# can't drift away from what the model actually saw. Short messages ("ok",
+# "call me") are matched exactly only: one changed word changes their meaning.
+#
+# `stage` (e.g. instrumentation.stage) times the vectorizer and the model on
+# the miss path as spam.tfidf_transform and spam.model_predict.
+
+NUM_HASHES = 64
+BANDS = 16           # 4 hashes per band: pairs at Jaccard 0.8 share a band with probability > 0.999
+THRESHOLD = 0.8      # estimated Jaccard similarity of the word sets (one word changed in ten: 0.82)
+MIN_NEAR_TOKENS = 5  # transformed messages with fewer words are only matched exactly
+
+
+def digest(transformed):
+    return hashlib.blake2b(transformed.encode(), digest_size=16).digest()
+
+
+@lru_cache(maxsize=100_000)
+def _word_hashes(word):
+    # NUM_HASHES independent 32-bit hashes of one word
+    return np.frombuffer(hashlib.shake_128(word.encode()).digest(4 * NUM_HASHES), dtype=np.uint32)
+
+
+def minhash(words):
+    # Per hash function, the minimum over the distinct words
+    return np.minimum.reduce([_word_hashes(word) for word in set(words)])
+
+
+def _band_values(signature):
+    rows = NUM_HASHES // BANDS
+    return [signature[i * rows:(i + 1) * rows].tobytes() for i in range(BANDS)]
+
+
+class VerdictCache:
+
+    def __init__(self, vectorizer, model, maxsize=8192, threshold=THRESHOLD, near_duplicates=True, stage=None):
+        self.vectorizer = vectorizer
+        self.model = model
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.near_duplicates = near_duplicates
+        self.stage = stage or (lambda name: nullcontext())
+        self.hits = 0
+        self.near_hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # digest -> (prediction, spam probability, MinHash signature or None)
+        self._bands = [{} for _ in range(BANDS)]  # band value -> {digest}
+        self._lock = threading.Lock()
+
+    # --- Near-duplicate index ---
+    def _nearest(self, signature):
+        # Cached digest of the most similar indexed signature at or above the threshold, or None
+        candidates = set()
+        for band, value in zip(self._bands, _band_values(signature)):
+            candidates.update(band.get(value, ()))
+        best, best_similarity = None, self.threshold
+        for key in candidates:
+            similarity = np.count_nonzero(self._data[key][2] == signature) / NUM_HASHES
+            if similarity >= best_similarity:
+                best, best_similarity = key, similarity
+        return best
+
+    def _index(self, key, signature):
+        for band, value in zip(self._bands, _band_values(signature)):
+            band.setdefault(value, set()).add(key)
+
+    def _unindex(self, key, signature):
+        for band, value in zip(self._bands, _band_values(signature)):
+            keys = band.get(value)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del band[value]
+
+    def _store(self, key, prediction, probability, signature=None):
+        # Called with the lock held; signature only for verdicts the model produced
+        if key in self._data:
+            self._data.move_to_end(key)
+            return
+        self._data[key] = (prediction, probability, signature)
+        if signature is not None:
+            self._index(key, signature)
+        while len(self._data) > self.maxsize:
+            evicted, (_, _, evicted_signature) = self._data.popitem(last=False)
+            if evicted_signature is not None:
+                self._unindex(evicted, evicted_signature)
+
+    # --- Scoring ---
+    def set_model(self, vectorizer, model):
+        # Verdicts belong to one model: a different one (e.g. a new online checkpoint) empties the cache
+        if vectorizer is not self.vectorizer or model is not self.model:
+            with self._lock:
+                self.vectorizer, self.model = vectorizer, model
+                self._data.clear()
+                for band in self._bands:
+                    band.clear()
+
+    def _score(self, transformed):
+        # -> [(prediction, spam probability or None, hit)]; hit: True for an exact or near-duplicate hit
+        keys = [digest(text) for text in transformed]
+        verdicts, missing = [None] * len(keys), {}
+        with self._lock:
+            for i, key in enumerate(keys):
+                verdict = self._data.get(key)
+                if verdict is not None:
+                    self._data.move_to_end(key)
+                    verdicts[i] = (verdict[0], verdict[1], True)
+                    self.hits += 1
+                else:
+                    missing.setdefault(key, []).append(i)
+
+        signatures = {}
+        if missing and self.near_duplicates:
+            for key, positions in list(missing.items()):
+                words = transformed[positions[0]].split()
+                if len(words) < MIN_NEAR_TOKENS:
+                    continue
+                signatures[key] = signature = minhash(words)
+                with self._lock:
+                    near = self._nearest(signature)
+                    if near is not None:
+                        prediction, probability, _ = self._data[near]
+                        self._store(key, prediction, probability)  # exact repeats of the variant now hit directly
+                        for i in positions:
+                            verdicts[i] = (prediction, probability, True)
+                        self.near_hits += len(positions)
+                        del missing[key]
+
+        if missing:
+            unique = list(missing)
+            with self.stage('spam.tfidf_transform'):
+                vectors = self.vectorizer.transform([transformed[missing[key][0]] for key in unique])
+            with self.stage('spam.model_predict'):
+                if hasattr(self.model, 'predict_proba'):  # predict() would compute the same probabilities again
+                    proba = self.model.predict_proba(vectors)
+                    predictions, probabilities = self.model.classes_[proba.argmax(axis=1)], proba[:, 1]
+                else:
+                    predictions, probabilities = self.model.predict(vectors), None
+            with self._lock:
+                self.misses += sum(len(positions) for positions in missing.values())
+                for j, key in enumerate(unique):
+                    prediction = int(predictions[j])
+                    probability = None if probabilities is None else float(probabilities[j])
+                    self._store(key, prediction, probability, signatures.get(key))
+                    for i in missing[key]:
+                        verdicts[i] = (prediction, probability, False)
+        return verdicts
+
+    def score(self, transformed):
+        # Transformed messages -> (predictions, spam probabilities or None), as spam_batch.score_batch;
+        # only messages with neither an exact nor a near-duplicate hit go through the model, in one batch
+        verdicts = self._score(transformed)
+        predictions = np.array([verdict[0] for verdict in verdicts], dtype=int)
+        if any(verdict[1] is None for verdict in verdicts):
+            return predictions, None
+        return predictions, np.array([verdict[1] for verdict in verdicts])
+
+    def predict(self, transformed):
+        # One transformed message -> (prediction, hit), hit telling whether the model was skipped
+        prediction, _, hit = self._score([transformed])[0]
+        return prediction, hit
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.near_hits + self.misses
+            return {'hits': self.hits, 'near_hits': self.near_hits, 'misses': self.misses,
+                    'size': len(self._data), 'maxsize': self.maxsize,
+                    'hit_rate': (self.hits + self.near_hits) / requests if requests else 0.0,
+                    'near_hit_rate': self.near_hits / requests if requests else 0.0}
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            for band in self._bands:
+                band.clear()
+            self.hits = self.near_hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
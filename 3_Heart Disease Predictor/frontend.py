@@ -1,9 +1,21 @@
+import json
+import sys
+import tempfile
+from pathlib import Path
 import numpy as np
 import pandas as pd
 import streamlit as st
-import pickle
-import base64
 import plotly.express as px
+from heart_io import missing_columns, write_predictions
+from model_pool import NOTEBOOK_ACCURACIES, ModelPool
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'common'))
+from instrumentation import profile_once, stage, timed # Stage timings, see common/instrumentation.py
+from mmap_artifacts import load_artifact # Memory-mapped .mmap artifacts when converted, else the pickles
+
+# Streamlit serves a download from memory, so the predictions CSV is held once in RAM;
+# bigger files go through the command line (heart_io.py), which streams to disk
+MAX_UPLOAD_MB = 50
 
 # --- Page setup & theming (UI only) ---
 st.set_page_config(
@@ -37,12 +49,13 @@ hr {border: none; border-top: 1px solid rgba(0,0,0,0.08); margin: .75rem 0 1rem;
 st.title("🫀 Heart Disease Predictor")
 st.caption("Make single or bulk predictions with pre-trained ML models, and review model metrics.")
 
-# --- Helper (unchanged functionality; fixed quote bug in download link) ---
-def get_binary_file_downloader(df):
-    csv = df.to_csv(index=False)
-    b64 = base64.b64encode(csv.encode()).decode()
-    href = f'<a href="data:file/csv;base64,{b64}" download="predictions.csv">⬇️ Download Predictions CSV</a>'
-    return href
+# --- Models: unpickled once per process (in parallel threads), not on every click ---
+@st.cache_resource
+@timed('heart.load_model_pool')
+def load_model_pool():
+    return ModelPool.load(parallel=True, loader=load_artifact)
+
+model_pool = load_model_pool()
 
 tab1, tab2, tab3 = st.tabs(['🔮 Predict', '📦 Bulk Predict', 'ℹ️ Model Information'])
 
@@ -93,28 +106,23 @@ with tab1:
         'ST_Slope': [st_slope]
     })
 
-    algo_names = ['Logistic Regression','Support Vector Machine','Decision Tree','Random Forest']
-    model_files = ['LogisticRegression.pkl','SVM.pkl','DecisionTree.pkl','RandomForest.pkl']
-
-    predictions = []
+    algo_names = list(model_pool.models)
 
     def predict_heart_disease(data):
-        for modelname in model_files:
-            model = pickle.load(open(modelname, 'rb'))
-            pred = model.predict(data)
-            predictions.append(pred[0])
-        return predictions
+        # One timed stage per model, so a slow model shows up on its own
+        return [pred[0] for pred in model_pool.predict_all(data, stage=stage).values()]
 
     st.markdown("<hr/>", unsafe_allow_html=True)
     if st.button("🔎 Predict Heart Disease"):
         st.subheader('📃 Results')
         st.markdown("<hr/>", unsafe_allow_html=True)
 
-        result = predict_heart_disease(input_data)
+        with profile_once('heart.predict'):
+            result = predict_heart_disease(input_data)
 
         # Display results in two columns for readability
         col_a, col_b = st.columns(2)
-        for i in range(len(predictions)):
+        for i in range(len(result)):
             container = col_a if i % 2 == 0 else col_b
             with container:
                 st.markdown(f"**{algo_names[i]}**  <span class='badge'>Model</span>", unsafe_allow_html=True)
@@ -153,28 +161,35 @@ with tab2:
         ''')
 
     uploaded_file = st.file_uploader("📤 Upload a CSV file", type=['csv'])
-
-    if uploaded_file is not None:
-        input_data = pd.read_csv(uploaded_file)
-        model = pickle.load(open('LogisticRegression.pkl', 'rb'))
-
-        expected_columns = ['Age','Sex','ChestPainType','RestingBP','Cholesterol','FastingBS','RestingECG', 'MaxHR','ExerciseAngina','Oldpeak','ST_Slope']
-        
-        if set(expected_columns).issubset(input_data.columns):
-
-            input_data['Prediction LR'] = ''
-
-            for i in range(len(input_data)):
-                arr = input_data.iloc[i, :-1].values
-                input_data['Prediction LR'][i] = model.predict([arr])[0]
-
-            input_data.to_csv('PredictedHeart.csv', index=False)
-
-            st.subheader("Predictions")
-            st.caption("Below are your predictions with an added **Prediction LR** column.")
-            st.write(input_data)
-
-            st.markdown(get_binary_file_downloader(input_data), unsafe_allow_html=True)
+    st.caption(f"Uploads are limited to {MAX_UPLOAD_MB} MB here. Larger files: "
+               "`python heart_io.py patients.csv PredictedHeart.csv` streams chunk by chunk to disk.")
+
+    if uploaded_file is not None and uploaded_file.size > MAX_UPLOAD_MB * 1024 * 1024:
+        st.error(f"⚠️ The file is {uploaded_file.size / 1024 / 1024:,.0f} MB, over the {MAX_UPLOAD_MB} MB limit of the app. "
+                 "Use `heart_io.py` from the command line instead.")
+    elif uploaded_file is not None:
+        if not missing_columns(uploaded_file):
+
+            # Read and predicted chunk by chunk with compact dtypes, so the upload is never held
+            # as a full DataFrame. The output goes to a temporary file private to this session
+            # (deleted on close), which is handed to the download button as a file: Streamlit's
+            # copy is the only one in memory.
+            try:
+                with tempfile.TemporaryFile(mode='w+', newline='', suffix='.csv') as out:
+                    with stage('heart.bulk_predict'):
+                        rows, preview = write_predictions(uploaded_file, out, model_pool)
+                    if not rows:
+                        st.warning("⚠️ The uploaded CSV file has no rows.")
+                    else:
+                        st.subheader("Predictions")
+                        st.caption(f"Predictions for **{rows:,}** rows, with a **Prediction** column per model (LR, SVM, DT, RF) and a **Prediction Majority** column. "
+                                   f"Showing the first {len(preview):,}.")
+                        st.write(preview)
+
+                        out.seek(0)
+                        st.download_button("⬇️ Download Predictions CSV", out, file_name='predictions.csv', mime='text/csv')
+            except ValueError as e:
+                st.error(f"⚠️ Could not read the file, check for NaN or non-numeric values: {e}")
 
         else:
             st.warning("⚠️ Please make sure the uploaded CSV file has the correct columns.")
@@ -188,12 +203,13 @@ with tab2:
 with tab3:
     st.markdown('<div class="section-card">', unsafe_allow_html=True)
     st.subheader("Model Accuracies")
-    data = {
-        'Decision Trees': 81.52,
-        'Logistic Regression': 85.86,
-        'Random Forest': 86.41,
-        'Support Vector Machine': 85.22
-    }
+    # Test accuracies written by train_heart.py; the notebook's numbers if it hasn't been run
+    try:
+        with open('metrics.json') as f:
+            metrics = json.load(f)['models']
+        data = {name: round(m['test_accuracy'] * 100, 2) for name, m in metrics.items()}
+    except (FileNotFoundError, KeyError, ValueError):
+        data = dict(NOTEBOOK_ACCURACIES)
     Models = list(data.keys())
     Accuracies = list(data.values())
     df = pd.DataFrame(list(zip(Models, Accuracies)), columns=['Models','Accuracies'])
@@ -0,0 +1,82 @@
+import pandas as pd
+
+from model_pool import FEATURES, ModelPool, ABBREVIATIONS
+
+# Chunked, bounded-memory bulk prediction.
+#
+# The upload is read CHUNKSIZE rows at a time with compact dtypes for the 11
+# features, each chunk is scored by the model pool and appended to the output
+# CSV, so only one chunk is ever held in memory regardless of the file size.
+#
+#   python heart_io.py patients.csv PredictedHeart.csv --chunksize 100000
+
+CHUNKSIZE = 50_000
+
+FEATURE_DTYPES = {
+    'Age': 'int16',
+    'Sex': 'int8',
+    'ChestPainType': 'int8',
+    'RestingBP': 'int16',
+    'Cholesterol': 'int16',
+    'FastingBS': 'int8',
+    'RestingECG': 'int8',
+    'MaxHR': 'int16',
+    'ExerciseAngina': 'int8',
+    'Oldpeak': 'float32',
+    'ST_Slope': 'int8',
+}
+
+
+def missing_columns(source):
+    # Reads only the header; rewinds file objects so the data can be read afterwards.
+    columns = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return [col for col in FEATURES if col not in columns]
+
+
+def read_chunks(source, chunksize=CHUNKSIZE):
+    yield from pd.read_csv(source, dtype=FEATURE_DTYPES, chunksize=chunksize)
+
+
+def predict_chunks(chunks, pool):
+    for chunk in chunks:
+        if chunk.empty:
+            continue
+        predictions = pool.predict_all(chunk)
+        for name, pred in predictions.items():
+            chunk[f'Prediction {ABBREVIATIONS[name]}'] = pred.astype('int8')
+        chunk['Prediction Majority'] = ModelPool.majority_vote(predictions).astype('int8')
+        yield chunk
+
+
+def write_predictions(source, out, pool, chunksize=CHUNKSIZE, preview_rows=1000):
+    # Streams predictions for `source` into the CSV file (path or text file) `out`.
+    # Returns the number of rows written and the first `preview_rows` rows for display.
+    rows, preview = 0, None
+    for i, chunk in enumerate(predict_chunks(read_chunks(source, chunksize), pool)):
+        chunk.to_csv(out, index=False, header=(i == 0), mode='w' if i == 0 else 'a')
+        if preview is None:
+            preview = chunk.head(preview_rows)
+        rows += len(chunk)
+    return rows, preview
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Bulk heart-disease prediction in bounded memory.")
+    parser.add_argument('input', help="CSV with the 11 feature columns")
+    parser.add_argument('output', help="where to write the CSV with predictions")
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    args = parser.parse_args()
+
+    missing = missing_columns(args.input)
+    if missing:
+        raise SystemExit(f"Missing columns: {', '.join(missing)}")
+
+    start = time.perf_counter()
+    rows, _ = write_predictions(args.input, args.output, ModelPool.load(), args.chunksize)
+    seconds = time.perf_counter() - start
+    print(f"{rows} rows written to {args.output} in {seconds:.1f}s ({rows / seconds:,.0f} rows/s)")
@@ -0,0 +1,71 @@
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+
+import numpy as np
+
+# The four trained heart-disease models, loaded once per process.
+
+FEATURES = ['Age','Sex','ChestPainType','RestingBP','Cholesterol','FastingBS','RestingECG','MaxHR','ExerciseAngina','Oldpeak','ST_Slope']
+
+MODEL_FILES = {
+    'Logistic Regression': 'LogisticRegression.pkl',
+    'Support Vector Machine': 'SVM.pkl',
+    'Decision Tree': 'DecisionTree.pkl',
+    'Random Forest': 'RandomForest.pkl',
+}
+
+ABBREVIATIONS = {
+    'Logistic Regression': 'LR',
+    'Support Vector Machine': 'SVM',
+    'Decision Tree': 'DT',
+    'Random Forest': 'RF',
+}
+
+# Test accuracies (%) reported in Code.ipynb, shown when train_heart.py's metrics.json
+# is missing; keyed by the same names as MODEL_FILES and metrics.json
+NOTEBOOK_ACCURACIES = {
+    'Logistic Regression': 85.86,
+    'Support Vector Machine': 85.22,
+    'Decision Tree': 81.52,
+    'Random Forest': 86.41,
+}
+
+
+def _load_pickle(path):
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+class ModelPool:
+
+    def __init__(self, models):
+        self.models = models  # algorithm name -> fitted estimator, in MODEL_FILES order
+
+    @classmethod
+    def load(cls, model_files=MODEL_FILES, parallel=True, loader=_load_pickle):
+        # With parallel=True every pickle is read in its own thread, so file I/O
+        # and the big numpy buffers of RandomForest overlap with the other models.
+        # loader: path -> model, e.g. mmap_artifacts.load_artifact.
+        if parallel:
+            import sklearn.base  # the first sklearn import isn't thread-safe: finish it before the threads unpickle
+            with ThreadPoolExecutor(max_workers=len(model_files)) as executor:
+                models = dict(zip(model_files, executor.map(loader, model_files.values())))
+        else:
+            models = {name: loader(path) for name, path in model_files.items()}
+        return cls(models)
+
+    def predict_all(self, df, stage=None):
+        # DataFrame with the 11 features -> {algorithm name: array of 0/1 predictions}
+        # stage (e.g. instrumentation.stage) times each model as heart.predict.<LR|SVM|DT|RF>
+        features = df[FEATURES]
+        predictions = {}
+        for name, model in self.models.items():
+            with stage(f'heart.predict.{ABBREVIATIONS[name]}') if stage else nullcontext():
+                predictions[name] = model.predict(features)
+        return predictions
+
+    @staticmethod
+    def majority_vote(predictions):
+        # 1 when at least half of the models predict heart disease (a 2-2 tie counts as disease)
+        return (np.mean(list(predictions.values()), axis=0) >= 0.5).astype(int)
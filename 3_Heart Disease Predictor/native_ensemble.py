@@ -0,0 +1,249 @@
+import numpy as np
+
+from model_pool import ABBREVIATIONS, FEATURES, MODEL_FILES, ModelPool
+
+# The four heart-disease models compiled to plain NumPy arrays.
+#
+# For a handful of rows, ModelPool.predict_all spends most of its time in
+# pandas and in scikit-learn's input validation, not in the models. Exporting
+# the fitted parameters (LR coefficients, SVM support vectors and kernel, the
+# node arrays of the decision tree and of every tree in the forest) into one
+# heart_native.npz lets the evaluator below score a batch with a few vectorized
+# NumPy operations and no pickles. Its predictions match scikit-learn's exactly;
+# `verify` also reports how far its decision values are from scikit-learn's.
+# Batches are evaluated CHUNK_ROWS rows at a time, so the per-tree node indices
+# and the SVM kernel matrix stay bounded on large uploads.
+#
+#   python native_ensemble.py export --out heart_native.npz
+#   python native_ensemble.py verify --data heart.csv
+
+NATIVE_FILE = 'heart_native.npz'
+CHUNK_ROWS = 4096
+
+KERNELS = ['linear', 'poly', 'rbf', 'sigmoid']
+
+_PREFIXES = {name: abbreviation.lower() for name, abbreviation in ABBREVIATIONS.items()}  # lr, svm, dt, rf
+
+
+# --- Export: fitted estimators -> arrays ---
+def _compile_linear(model):
+    return {'coef': model.coef_.astype(np.float64), 'intercept': model.intercept_.astype(np.float64),
+            'classes': model.classes_}
+
+
+def _compile_svm(model):
+    if model.kernel not in KERNELS:
+        raise TypeError(f"Unsupported SVM kernel: {model.kernel!r}")
+    return {'support_vectors': model.support_vectors_, 'dual_coef': model.dual_coef_,
+            'intercept': model.intercept_, 'classes': model.classes_,
+            'kernel': np.array(KERNELS.index(model.kernel)), 'gamma': np.array(model._gamma, dtype=np.float64),
+            'coef0': np.array(model.coef0, dtype=np.float64), 'degree': np.array(model.degree)}
+
+
+def _compile_trees(trees, classes):
+    # All trees are concatenated into one set of node arrays; child indices are
+    # made global and `roots` holds the offset of every tree's first node.
+    feature, threshold, left, right, value, roots = [], [], [], [], [], []
+    offset = 0
+    for tree in trees:
+        t = tree.tree_
+        is_leaf = t.children_left == -1
+        roots.append(offset)
+        feature.append(np.where(is_leaf, 0, t.feature))
+        threshold.append(t.threshold)
+        # Leaves point at themselves so traversal can run a fixed number of steps
+        nodes = np.arange(t.node_count) + offset
+        left.append(np.where(is_leaf, nodes, t.children_left + offset))
+        right.append(np.where(is_leaf, nodes, t.children_right + offset))
+        # Class probabilities per leaf, normalized the way predict_proba does it
+        proba = t.value[:, 0, :len(classes)].astype(np.float64)
+        normalizer = proba.sum(axis=1, keepdims=True)
+        normalizer[normalizer == 0.0] = 1.0
+        value.append(proba / normalizer)
+        offset += t.node_count
+    return {'feature': np.concatenate(feature).astype(np.intp), 'threshold': np.concatenate(threshold),
+            'left': np.concatenate(left).astype(np.intp), 'right': np.concatenate(right).astype(np.intp),
+            'value': np.concatenate(value), 'roots': np.array(roots, dtype=np.intp),
+            'depth': np.array(max(tree.get_depth() for tree in trees)), 'classes': classes}
+
+
+def compile_models(models):
+    # {algorithm name: fitted estimator} (as in ModelPool.models) -> {npz key: array}
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.svm import SVC
+    from sklearn.tree import DecisionTreeClassifier
+
+    compilers = {
+        'Logistic Regression': (LogisticRegression, _compile_linear),
+        'Support Vector Machine': (SVC, _compile_svm),
+        'Decision Tree': (DecisionTreeClassifier, lambda m: _compile_trees([m], m.classes_)),
+        'Random Forest': (RandomForestClassifier, lambda m: _compile_trees(m.estimators_, m.classes_)),
+    }
+    arrays = {}
+    for name, model in models.items():
+        expected, compile_model = compilers[name]
+        if not isinstance(model, expected):
+            raise TypeError(f"{name}: expected {expected.__name__}, got {type(model).__name__}")
+        if len(model.classes_) != 2:
+            raise ValueError(f"{name}: only binary classifiers can be compiled")
+        for key, array in compile_model(model).items():
+            arrays[f'{_PREFIXES[name]}_{key}'] = np.asarray(array)
+    return arrays
+
+
+def export(pool, path=NATIVE_FILE):
+    np.savez(path, **compile_models(pool.models))
+
+
+# --- Evaluation ---
+# Decision values as scikit-learn computes them: decision_function for LR and
+# the SVM (positive: classes[1]), the averaged class probabilities for trees.
+def _linear_decision(p, X):
+    return (X @ p['coef'].T + p['intercept'])[:, 0]
+
+
+def _svm_decision(p, X):
+    kernel = KERNELS[int(p['kernel'])]
+    sv = p['support_vectors']
+    if kernel == 'rbf':
+        sq_dist = (X ** 2).sum(axis=1)[:, None] - 2.0 * (X @ sv.T) + (sv ** 2).sum(axis=1)[None, :]
+        K = np.exp(-p['gamma'] * sq_dist)
+    else:
+        K = X @ sv.T
+        if kernel == 'poly':
+            K = (p['gamma'] * K + p['coef0']) ** p['degree']
+        elif kernel == 'sigmoid':
+            K = np.tanh(p['gamma'] * K + p['coef0'])
+    return K @ p['dual_coef'][0] + p['intercept'][0]
+
+
+def _tree_proba(p, X):
+    # Walks every row down every tree at once: `nodes` is (n_trees, n_rows).
+    # Trees compare float32 features to their thresholds, like scikit-learn.
+    X = X.astype(np.float32)
+    rows = np.arange(len(X))
+    nodes = np.repeat(p['roots'][:, None], len(X), axis=1)
+    for _ in range(int(p['depth'])):
+        go_left = X[rows, p['feature'][nodes]] <= p['threshold'][nodes]
+        nodes = np.where(go_left, p['left'][nodes], p['right'][nodes])
+    proba = p['value'][nodes[0]]
+    for tree_nodes in nodes[1:]:  # summed tree by tree, in the forest's order
+        proba += p['value'][tree_nodes]
+    return proba / len(p['roots'])
+
+
+def _margin_predict(decision):
+    return lambda p, X: p['classes'][(decision(p, X) > 0).astype(np.intp)]
+
+
+def _tree_predict(p, X):
+    return p['classes'][np.argmax(_tree_proba(p, X), axis=1)]
+
+
+_EVALUATORS = {
+    'Logistic Regression': _margin_predict(_linear_decision),
+    'Support Vector Machine': _margin_predict(_svm_decision),
+    'Decision Tree': _tree_predict,
+    'Random Forest': _tree_predict,
+}
+
+_DECISIONS = {
+    'Logistic Regression': _linear_decision,
+    'Support Vector Machine': _svm_decision,
+    'Decision Tree': lambda p, X: _tree_proba(p, X)[:, 1],
+    'Random Forest': lambda p, X: _tree_proba(p, X)[:, 1],
+}
+
+
+def _as_array(X):
+    # DataFrame with the 11 features, or an (n, 11) array in FEATURES order -> float64 array
+    if hasattr(X, 'columns'):
+        X = X[FEATURES].to_numpy()
+    return np.atleast_2d(np.asarray(X, dtype=np.float64))
+
+
+class NativeEnsemble:
+
+    def __init__(self, arrays):
+        # npz key -> array, split per algorithm in MODEL_FILES order
+        self.params = {}
+        for name in MODEL_FILES:
+            prefix = _PREFIXES[name] + '_'
+            self.params[name] = {key[len(prefix):]: value for key, value in arrays.items() if key.startswith(prefix)}
+
+    @classmethod
+    def load(cls, path=NATIVE_FILE, loader=None):
+        # loader: path -> {key: array}, e.g. mmap_artifacts.load_artifact for heart_native.mmap/
+        if loader is not None:
+            return cls(loader(path))
+        with np.load(path) as npz:
+            return cls({key: npz[key] for key in npz.files})
+
+    @classmethod
+    def from_pool(cls, pool):
+        return cls(compile_models(pool.models))
+
+    def _evaluate(self, evaluators, X, chunk_rows):
+        X = _as_array(X)
+        if len(X) <= chunk_rows:
+            return {name: evaluators[name](params, X) for name, params in self.params.items()}
+        chunks = [self._evaluate(evaluators, X[i:i + chunk_rows], chunk_rows) for i in range(0, len(X), chunk_rows)]
+        return {name: np.concatenate([chunk[name] for chunk in chunks]) for name in self.params}
+
+    def predict_all(self, X, chunk_rows=CHUNK_ROWS):
+        # DataFrame with the 11 features, or an (n, 11) array in FEATURES order
+        # -> {algorithm name: array of 0/1 predictions}, like ModelPool.predict_all
+        return self._evaluate(_EVALUATORS, X, chunk_rows)
+
+    def decision_values(self, X, chunk_rows=CHUNK_ROWS):
+        # -> {algorithm name: decision_function (LR, SVM) or probability of disease (trees)}
+        return self._evaluate(_DECISIONS, X, chunk_rows)
+
+    majority_vote = staticmethod(ModelPool.majority_vote)
+
+
+if __name__ == '__main__':
+    import argparse
+    import time
+
+    parser = argparse.ArgumentParser(description="Compile the heart-disease models to NumPy arrays and check them.")
+    parser.add_argument('command', choices=['export', 'verify'])
+    parser.add_argument('--out', default=NATIVE_FILE, help="npz file to write (export) or read (verify)")
+    parser.add_argument('--data', default='heart.csv', help="dataset to compare predictions on (verify)")
+    parser.add_argument('--repeat', type=int, default=1000, help="single-row predictions to time (verify)")
+    args = parser.parse_args()
+
+    pool = ModelPool.load()
+    if args.command == 'export':
+        export(pool, args.out)
+        print(f"Models compiled to {args.out}")
+    else:
+        from train_heart import load_heart_data
+
+        native = NativeEnsemble.load(args.out)
+        X = load_heart_data(args.data)[FEATURES]
+        expected, actual = pool.predict_all(X), native.predict_all(X)
+        mismatches = {name: int((expected[name] != actual[name]).sum()) for name in expected}
+        native_values = native.decision_values(X)
+        for name, count in mismatches.items():
+            model = pool.models[name]
+            values = (model.decision_function(X) if hasattr(model, 'decision_function')
+                      else model.predict_proba(X)[:, 1])
+            difference = np.abs(values - native_values[name]).max()
+            print(f"{name:<24} {count} of {len(X)} predictions differ, max decision value difference {difference:.2e}")
+
+        # Each path gets its natural input: a DataFrame for scikit-learn, an array for the native one
+        for label, model, data in [('scikit-learn', pool, X), ('native', native, X.to_numpy(dtype=np.float64))]:
+            row = data[:1]
+            start = time.perf_counter()
+            for _ in range(args.repeat):
+                model.predict_all(row)
+            single = (time.perf_counter() - start) / args.repeat
+            start = time.perf_counter()
+            model.predict_all(data)
+            batch = (time.perf_counter() - start) / len(X)
+            print(f"{label:<13} single row {single * 1e6:9.1f} us   batch {batch * 1e6:7.2f} us/row")
+
+        if any(mismatches.values()):
+            raise SystemExit("Native predictions differ from scikit-learn")
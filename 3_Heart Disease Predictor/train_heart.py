@@ -0,0 +1,147 @@
+import argparse
+import itertools
+import json
+import os
+import pickle
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.ensemble import RandomForestClassifier
+from sklearn.impute import KNNImputer
+from sklearn.linear_model import LogisticRegression
+from sklearn.metrics import accuracy_score
+from sklearn.model_selection import StratifiedKFold, cross_val_score, train_test_split
+from sklearn.svm import SVC
+from sklearn.tree import DecisionTreeClassifier
+
+from model_pool import MODEL_FILES
+
+# Reproducible training for the four heart-disease models (Code.ipynb as a CLI).
+#
+# Every candidate of every model family is scored with stratified k-fold cross
+# validation in a process pool, the best candidate per family is refit on the
+# training split, pickled, and its metrics are written to metrics.json, which
+# the app's Model Information tab reads.
+#
+#   python train_heart.py --data heart.csv --out-dir . --workers 8
+
+RANDOM_STATE = 42
+
+FAMILIES = {
+    'Logistic Regression': (LogisticRegression, [
+        {'solver': s} for s in ['lbfgs', 'liblinear', 'newton-cg', 'newton-cholesky', 'sag', 'saga']
+    ]),
+    'Support Vector Machine': (SVC, [
+        {'kernel': k} for k in ['linear', 'poly', 'rbf', 'sigmoid']
+    ]),
+    'Decision Tree': (DecisionTreeClassifier, [
+        {'max_depth': d, 'criterion': c, 'min_samples_split': s, 'min_samples_leaf': l,
+         'random_state': r, 'class_weight': 'balanced'}
+        for d, c, s, l, r in itertools.product([3, 4, 5, 6, 7, 8], ['gini', 'entropy', 'log_loss'],
+                                               [2, 3, 4], [1, 2, 3, 4], [0, 42])
+    ]),
+    'Random Forest': (RandomForestClassifier, [
+        {'n_estimators': n, 'max_features': f, 'max_depth': d, 'max_leaf_nodes': l, 'random_state': RANDOM_STATE}
+        for n, f, d, l in itertools.product([50, 100, 150, 200, 500], ['sqrt', 'log2', None],
+                                            [3, 6, 9, 19], [3, 6, 9])
+    ]),
+}
+
+
+# --- Data ---
+def load_heart_data(path):
+    heart_df = pd.read_csv(path)
+
+    # Categorical columns -> codes in order of first appearance (as in the notebook)
+    for col in heart_df.select_dtypes(include=['object', 'category', 'string']).columns:
+        codes = {value: code for code, value in enumerate(heart_df[col].unique())}
+        heart_df[col] = heart_df[col].map(codes)
+
+    # '0' Cholesterol and RestingBP are missing values: both are imputed in a single KNN pass
+    heart_df[['Cholesterol', 'RestingBP']] = heart_df[['Cholesterol', 'RestingBP']].replace(0, np.nan)
+    heart_df = pd.DataFrame(KNNImputer(n_neighbors=3).fit_transform(heart_df), columns=heart_df.columns)
+
+    without_oldpeak = heart_df.columns.drop('Oldpeak')
+    heart_df[without_oldpeak] = heart_df[without_oldpeak].astype(int)
+    return heart_df
+
+
+# --- Candidate evaluation (runs in worker processes) ---
+_X = _y = _cv = None
+
+
+def _init_worker(X, y, folds):
+    global _X, _y, _cv
+    _X, _y = X, y
+    _cv = StratifiedKFold(n_splits=folds, shuffle=True, random_state=RANDOM_STATE)
+    warnings.filterwarnings('ignore')
+
+
+def _evaluate(job):
+    family, params = job
+    estimator_cls, _ = FAMILIES[family]
+    start = time.perf_counter()
+    scores = cross_val_score(estimator_cls(**params), _X, _y, cv=_cv, scoring='accuracy')
+    return family, params, scores.mean(), scores.std(), time.perf_counter() - start
+
+
+def search(X_train, y_train, folds=5, workers=None, families=FAMILIES):
+    jobs = [(family, params) for family, (_, grid) in families.items() for params in grid]
+    best = {}
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X_train, y_train, folds)) as executor:
+        for family, params, mean, std, seconds in executor.map(_evaluate, jobs, chunksize=4):
+            if family not in best or mean > best[family]['cv_accuracy']:
+                best[family] = {'params': params, 'cv_accuracy': mean, 'cv_std': std, 'cv_seconds': seconds}
+    return best
+
+
+def train(data='heart.csv', out_dir='.', folds=5, workers=None, test_size=0.2):
+    heart_df = load_heart_data(data)
+    X = heart_df.drop('HeartDisease', axis=1)
+    y = heart_df['HeartDisease']
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=test_size, random_state=RANDOM_STATE, stratify=y)
+
+    start = time.perf_counter()
+    best = search(X_train, y_train, folds, workers)
+    search_seconds = time.perf_counter() - start
+
+    metrics = {}
+    for family, result in best.items():
+        estimator_cls, grid = FAMILIES[family]
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')  # e.g. lbfgs convergence on unscaled features, as in the notebook
+            model = estimator_cls(**result['params']).fit(X_train, y_train)
+        with open(os.path.join(out_dir, MODEL_FILES[family]), 'wb') as f:
+            pickle.dump(model, f)
+
+        metrics[family] = {
+            'file': MODEL_FILES[family],
+            'params': result['params'],
+            'candidates': len(grid),
+            'cv_accuracy': round(float(result['cv_accuracy']), 4),
+            'cv_std': round(float(result['cv_std']), 4),
+            'test_accuracy': round(float(accuracy_score(y_test, model.predict(X_test))), 4),
+        }
+
+    summary = {'data': os.path.basename(data), 'folds': folds, 'test_size': test_size,
+               'random_state': RANDOM_STATE, 'search_seconds': round(search_seconds, 2), 'models': metrics}
+    with open(os.path.join(out_dir, 'metrics.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Train the four heart-disease models with cross-validated model selection.")
+    parser.add_argument('--data', default='heart.csv')
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    args = parser.parse_args()
+
+    summary = train(args.data, args.out_dir, args.folds, args.workers)
+    for family, m in summary['models'].items():
+        print(f"{family:<24} cv {m['cv_accuracy']:.4f} ± {m['cv_std']:.4f}  test {m['test_accuracy']:.4f}  {m['params']}")
+    print(f"Search took {summary['search_seconds']}s, metrics written to {os.path.join(args.out_dir, 'metrics.json')}")
@@ -0,0 +1,87 @@
+import argparse
+import time
+
+import pandas as pd
+
+from laptop_features import FEATURES, engineer_features
+
+# Rows/sec of the vectorized feature engineering (laptop_features.py) against
+# the notebook's row-wise .apply() version, on laptop_data.csv repeated to
+# catalog sizes. Both versions must produce the same 12 features.
+#
+#   python features_benchmark.py --data laptop_data.csv --sizes 1303 13030 130300
+
+
+# --- The notebook's version (Code.ipynb), kept as the reference ---
+def fetch_processor(text):
+    if (text == 'Intel Core i7') or (text == 'Intel Core i5') or text == ('Intel Core i3'):
+        return text
+    elif (text.split()[0]) == 'Intel':
+        return 'Other Intel Processor'
+    else:
+        return 'AMD Processor'
+
+
+def cat_os(inp):
+    if (inp == 'Windows 10') or (inp == 'Windows 7') or (inp == 'Windows 10 S'):
+        return 'Windows'
+    elif inp == 'macOS' or inp == 'Mac OS X':
+        return 'Mac'
+    else:
+        return 'Others/No OS/Linux'
+
+
+def notebook_features(df):
+    df = df.copy()
+    df['Ram'] = df['Ram'].str.replace('GB', '').astype('int32')
+    df['Weight'] = df['Weight'].str.replace('kg', '').astype('float32')
+    df['Touchscreen'] = df['ScreenResolution'].apply(lambda x: 1 if 'Touchscreen' in x else 0)
+    df['Ips'] = df['ScreenResolution'].apply(lambda x: 1 if 'IPS' in x else 0)
+    new = df['ScreenResolution'].str.split('x', n=1, expand=True)
+    df['X_res'] = new[0].str.replace(',', '').str.findall(r'(\d+\.?\d+)').apply(lambda x: x[0]).astype('int')
+    df['Y_res'] = new[1].astype('int')
+    df['ppi'] = ((df['X_res']**2 + df['Y_res']**2)**0.5 / df['Inches']).astype(float)
+    df['Cpu brand'] = df['Cpu'].apply(lambda x: " ".join(x.split()[0:3])).apply(fetch_processor)
+
+    memory = df['Memory'].astype(str).replace(r'\.0', '', regex=True).str.replace('GB', '').str.replace('TB', '000')
+    new = memory.str.split("+", n=1, expand=True)
+    first, second = new[0].str.strip().astype(str), new[1].astype(str)
+    first_num = pd.to_numeric(first.str.extract(r'(\d+)', expand=False), errors='coerce').fillna(0).astype(int)
+    second_num = pd.to_numeric(second.str.extract(r'(\d+)', expand=False), errors='coerce').fillna(0).astype(int)
+    df['HDD'] = first_num * first.str.contains('HDD').astype(int) + second_num * second.str.contains('HDD').astype(int)
+    df['SSD'] = first_num * first.str.contains('SSD').astype(int) + second_num * second.str.contains('SSD').astype(int)
+
+    df['Gpu brand'] = df['Gpu'].apply(lambda x: x.split()[0])
+    df['os'] = df['OpSys'].apply(cat_os)
+    return df[FEATURES]
+
+
+def rows_per_second(func, df, repeat):
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(df)
+        best = min(best, time.perf_counter() - start)
+    return len(df) / best
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Benchmark vectorized vs row-wise laptop feature engineering.")
+    parser.add_argument('--data', default='laptop_data.csv')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1303, 13030, 130300])
+    parser.add_argument('--repeat', type=int, default=3, help="runs per size, the best is reported")
+    args = parser.parse_args()
+
+    data = pd.read_csv(args.data)
+    reference, vectorized = notebook_features(data), engineer_features(data)[FEATURES]
+    differences = {col: int((reference[col] != vectorized[col]).sum()) for col in FEATURES}
+    if any(differences.values()):
+        raise SystemExit(f"Vectorized features differ from the notebook's: {differences}")
+    print(f"Features identical on {len(data)} rows of {args.data}")
+
+    print(f"{'rows':>10} {'apply rows/s':>14} {'vectorized rows/s':>18} {'speedup':>8}")
+    for size in args.sizes:
+        df = pd.concat([data] * -(-size // len(data)), ignore_index=True).head(size)
+        slow = rows_per_second(notebook_features, df, args.repeat)
+        fast = rows_per_second(engineer_features, df, args.repeat)
+        print(f"{size:>10} {slow:>14,.0f} {fast:>18,.0f} {fast / slow:>7.1f}x")
@@ -1,6 +1,21 @@
 import streamlit as st
 import pickle
-import numpy as np
+import sys
+import tempfile
+from pathlib import Path
+
+from laptop_features import RAW_COLUMNS, resolution_ppi
+from laptop_schema import load_schema
+from prediction_cache import PredictionCache
+from price_batch import missing_columns, write_prices
+
+sys.path.append(str(Path(__file__).resolve().parents[1] / 'common'))
+from instrumentation import count, profile_once, stage, timed # Stage timings, see common/instrumentation.py
+from mmap_artifacts import load_artifact # Memory-mapped .mmap artifacts when converted, else the pickles
+
+# Streamlit serves a download from memory, so the priced catalog is held once in RAM;
+# bigger catalogs go through the command line (price_batch.py), which streams to disk
+MAX_UPLOAD_MB = 50
 
 # --- Page config and header ---
 st.set_page_config(page_title="Laptop Price Predictor", page_icon="💻", layout="centered")
@@ -47,17 +62,43 @@ div[data-testid="stMetricValue"] {
 
 
 # --- Load model and data ---
+@st.cache_resource
+@timed('laptop.load_model')
+def load_model():
+    # Loaded once per process: the pipeline and the small schema.json (dropdown values,
+    # numeric ranges, common configurations), not the training DataFrame
+    return load_artifact('pipe.pkl'), load_schema('schema.json')
+
+
+@st.cache_resource
+def load_dataset():
+    # df.pkl is only needed for the dataset preview
+    with open('df.pkl', 'rb') as f:
+        return pickle.load(f)
+
+
+@st.cache_resource
+def load_prediction_cache(_pipe, _configurations):
+    # Built once per process; pre-warmed with the most common configurations in the training data
+    cache = PredictionCache(_pipe, maxsize=4096)
+    cache.prewarm(_configurations)
+    return cache
+
+
 try:
-    pipe = pickle.load(open('pipe.pkl','rb'))
-    df = pickle.load(open('df.pkl','rb'))
+    pipe, schema = load_model()
 except FileNotFoundError:
-    st.error("Error: Model files (pipe.pkl, df.pkl) not found in the directory.")
-    st.info("Please make sure the necessary model files are present to run the app.")
+    st.error("Error: Model files (pipe.pkl, schema.json) not found in the directory.")
+    st.info("Please make sure the necessary model files are present to run the app. "
+            "`python laptop_schema.py` creates schema.json from an existing df.pkl.")
     st.stop()
 except Exception as e:
     st.error(f"An error occurred while loading model files: {e}")
     st.stop()
 
+prediction_cache = load_prediction_cache(pipe, schema['configurations'])
+categories = schema['categories']
+
 # --- Page config and header ---
 st.title("💻 Laptop Price Predictor")
 st.markdown("Predict an estimated laptop price using a trained model. Adjust features and press **Predict Price**.")
@@ -70,7 +111,10 @@ with st.sidebar:
     st.write("Select features in the tabs.") 
     st.write("---")
     if st.checkbox("Show dataset sample"):
-        st.dataframe(df.sample(5))
+        try:
+            st.dataframe(load_dataset().sample(5))
+        except FileNotFoundError:
+            st.info("The dataset (df.pkl) is not available in this deployment.")
 
 
 # ------------- Main input layout -----------
@@ -79,11 +123,11 @@ tab1, tab2, tab3 = st.tabs(["💻 Core Specs", "💾 Hardware", "🖥️ Display
 with tab1:
     st.subheader("Basic Specs")
 
-    company = st.selectbox('Brand', df['Company'].unique(), help='Laptop manufacturer / brand')
-    type = st.selectbox('Type', df['TypeName'].unique(), help='Laptop type (Notebook/Gaming/Ultrabook etc.)')
-    cpu = st.selectbox('CPU', df['Cpu brand'].unique(), help='CPU brand')
-    gpu = st.selectbox('GPU', df['Gpu brand'].unique(), help='GPU brand')
-    os = st.selectbox("OS", df['os'].unique(), help='Operating system')
+    company = st.selectbox('Brand', categories['Company'], help='Laptop manufacturer / brand')
+    type = st.selectbox('Type', categories['TypeName'], help='Laptop type (Notebook/Gaming/Ultrabook etc.)')
+    cpu = st.selectbox('CPU', categories['Cpu brand'], help='CPU brand')
+    gpu = st.selectbox('GPU', categories['Gpu brand'], help='GPU brand')
+    os = st.selectbox("OS", categories['os'], help='Operating system')
 
 with tab2:
     st.subheader("Hardware Specs")
@@ -91,7 +135,9 @@ with tab2:
     ram = st.selectbox('RAM (GB)', [2,4,6,8,12,16,24,32,64], index=3, help='System memory in GB')
     hdd = st.selectbox('HDD (GB)', [0,128,256,512,1024,2048], help='Hard disk drive capacity')
     ssd = st.selectbox('SSD (GB)', [0,8,128,256,512,1024,2048], help='Solid state drive capacity')
-    weight = st.number_input('Weight of Laptop (kg)', min_value=0.0, format="%.2f", help='Enter laptop weight in kilograms')
+    weight_range = schema['ranges']['Weight']
+    weight = st.number_input('Weight of Laptop (kg)', min_value=0.0, format="%.2f",
+                             help=f"Enter laptop weight in kilograms (training data: {weight_range['min']:.2f} to {weight_range['max']:.2f} kg)")
 
 with tab3:
     st.subheader("Display")
@@ -111,8 +157,6 @@ with colc2:
 
 # --- Prediction logic---
 if predict_button:
-    ppi = None
-
     if touchscreen == 'Yes':
         touchscreen_val = 1
     else:
@@ -123,26 +167,20 @@ if predict_button:
     else:
         ips_val = 0
 
-    # parse resolution safely
-    try:
-        X_res = int(resolution.split('x')[0])
-        Y_res = int(resolution.split('x')[1])
-    except Exception:
-        X_res = 0
-        Y_res = 0
-
-    # compute PPI only when screen_size is a positive number
-    if screen_size and float(screen_size) > 0:
-        ppi = ((X_res**2 + Y_res**2)**0.5) / float(screen_size)
-    else:
+    # resolution parsing and PPI come from laptop_features.py, the same code used for training
+    with stage('laptop.ppi'):
+        ppi = resolution_ppi(resolution, screen_size)
+    if ppi is None:
         st.warning('Screen Size must be greater than zero to compute PPI. Using PPI=0 for prediction.')
         ppi = 0.0
 
-    query = np.array([company, type, ram, weight, touchscreen_val, ips_val, ppi, cpu, hdd, ssd, gpu, os], dtype=object)
-    query = query.reshape(1, 12)
+    query = [company, type, ram, weight, touchscreen_val, ips_val, ppi, cpu, hdd, ssd, gpu, os]
 
-    # model prediction 
-    prediction = int(np.exp(pipe.predict(query)[0]))
+    # model prediction (served from the LRU cache for configurations seen before)
+    with profile_once('laptop.predict'), stage('laptop.predict'):
+        price, hit = prediction_cache.predict(query)
+    prediction = int(price)
+    count('laptop.cache_hit' if hit else 'laptop.pipe_predict')
 
     # --- Output Display ---
     st.write("---")
@@ -153,4 +191,53 @@ if predict_button:
         with colr2:
             st.metric(label="Estimated Price", value=f"₹ {prediction:,.2f}") 
             
-        st.caption("Price shown is the model's estimate. Consider this as guidance, not an exact market price.")
\ No newline at end of file
+        st.caption("Price shown is the model's estimate. Consider this as guidance, not an exact market price.")
+        stats = prediction_cache.stats()
+        st.caption(f"Prediction cache: {stats['hits']} hits, {stats['misses']} misses ({stats['hit_rate']:.0%} hit rate), "
+                   f"{stats['size']:,} configurations cached.")
+
+
+# --- Bulk prediction (catalog CSV) ---
+st.write("---")
+st.subheader("📦 Bulk Price Prediction")
+with st.expander("📋 Instructions to upload file"):
+    st.info(f'''
+Upload raw listings with the same columns as `laptop_data.csv`:  
+**({', '.join(RAW_COLUMNS)})**  
+Values are written as in the dataset, e.g. Ram `8GB`, Weight `1.37kg`, Memory `128GB SSD +  1TB HDD`, ScreenResolution `IPS Panel Full HD 1920x1080`.
+Listings that can't be priced (unparseable values, or a brand/CPU/GPU/OS the model has never seen) get an empty price.
+''')
+
+uploaded_file = st.file_uploader("📤 Upload a catalog CSV", type=['csv'])
+st.caption(f"Uploads are limited to {MAX_UPLOAD_MB} MB here. Larger catalogs: "
+           "`python price_batch.py catalog.csv priced_catalog.csv` streams chunk by chunk to disk.")
+
+if uploaded_file is not None and uploaded_file.size > MAX_UPLOAD_MB * 1024 * 1024:
+    st.error(f"⚠️ The file is {uploaded_file.size / 1024 / 1024:,.0f} MB, over the {MAX_UPLOAD_MB} MB limit of the app. "
+             "Use `price_batch.py` from the command line instead.")
+elif uploaded_file is not None:
+    # A malformed or non-UTF-8 upload raises ParserError/UnicodeDecodeError, both ValueErrors
+    try:
+        missing = missing_columns(uploaded_file)
+    except ValueError as e:
+        st.error(f"⚠️ Could not read the file as CSV: {e}")
+        missing = None
+    if missing:
+        st.warning(f"⚠️ The uploaded CSV file is missing these columns: {', '.join(missing)}")
+    elif missing is not None:
+        # Feature engineering is vectorized and each chunk is priced with one pipe.predict call.
+        # The output goes to a temporary file private to this session (deleted on close), which
+        # is handed to the download button as a file: Streamlit's copy is the only one in memory.
+        try:
+            with tempfile.TemporaryFile(mode='w+', newline='', suffix='.csv') as out:
+                with stage('laptop.bulk_predict'):
+                    rows, priced, preview = write_prices(uploaded_file, out, pipe)
+                if not rows:
+                    st.warning("⚠️ The uploaded CSV file has no rows.")
+                else:
+                    st.caption(f"Priced **{priced:,}** of **{rows:,}** listings. Showing the first {len(preview):,}.")
+                    st.dataframe(preview)
+                    out.seek(0)
+                    st.download_button("⬇️ Download Prices CSV", out, file_name='predicted_prices.csv', mime='text/csv')
+        except ValueError as e:
+            st.error(f"⚠️ Could not read the file, check that it is a UTF-8 CSV like laptop_data.csv: {e}")
@@ -0,0 +1,156 @@
+import re
+
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+# Feature engineering from Code.ipynb, vectorized over a whole DataFrame.
+#
+# Turns raw listings (the columns of laptop_data.csv) into the 12 features
+# pipe.pkl was trained on, with pandas string methods, precompiled regexes and
+# NumPy instead of a per-row apply. A catalog only has a few hundred distinct
+# CPU, GPU, memory and screen strings, so every string column is factorized and
+# parsed once per distinct value; the results are broadcast back to the rows
+# with the integer codes. The same code is used for training (LaptopFeatures as
+# the first stage of a pipeline, or training_frame) and for serving
+# (price_batch.py, frontend.py), so both always see identical features.
+
+RAW_COLUMNS = ['Company', 'TypeName', 'Inches', 'ScreenResolution', 'Cpu', 'Ram', 'Memory', 'Gpu', 'OpSys', 'Weight']
+
+# Column order of the training data (and of the 1x12 query in frontend.py)
+FEATURES = ['Company', 'TypeName', 'Ram', 'Weight', 'Touchscreen', 'Ips', 'ppi', 'Cpu brand', 'HDD', 'SSD', 'Gpu brand', 'os']
+
+CATEGORICAL = ['Company', 'TypeName', 'Cpu brand', 'Gpu brand', 'os']
+
+RESOLUTION_RE = re.compile(r'(\d+)x(\d+)\s*$')              # "IPS Panel Full HD 1920x1080"
+CORE_I_RE = re.compile(r'^\s*Intel\s+Core\s+(i[357])(?:\s|$)')  # "Intel Core i5 7200U 2.5GHz"
+INTEL_RE = re.compile(r'^\s*Intel(?:\s|$)')
+FIRST_WORD_RE = re.compile(r'^\s*(\S+)')                    # "Nvidia GeForce GTX 1050" -> "Nvidia"
+DECIMAL_ZERO_RE = re.compile(r'\.0')                        # "1.0TB" -> "1TB"
+NUMBER_RE = re.compile(r'(\d+)')
+RAM_RE = re.compile(r'GB')
+WEIGHT_RE = re.compile(r'kg')
+
+
+def per_unique(values, func):
+    # Runs the Series -> Series (or tuple of Series) function `func` on the
+    # distinct values of `values` only and maps the results back to every row.
+    codes, uniques = pd.factorize(values, use_na_sentinel=False)
+    result = func(pd.Series(uniques, dtype=values.dtype))
+    if isinstance(result, tuple):
+        return tuple(pd.Series(r.to_numpy()[codes], index=values.index) for r in result)
+    return pd.Series(result.to_numpy()[codes], index=values.index)
+
+
+# --- Individual features (each works on any Series; engineer_features runs them per unique value) ---
+def screen_flags(resolution):
+    return (resolution.str.contains('Touchscreen', regex=False, na=False).astype(int),
+            resolution.str.contains('IPS', regex=False, na=False).astype(int))
+
+
+def resolution_pixels(resolution):
+    # "IPS Panel Full HD 1920x1080" -> X_res 1920.0, Y_res 1080.0
+    res = resolution.str.extract(RESOLUTION_RE).astype(float)
+    return res[0], res[1]
+
+
+def ppi(resolution, inches):
+    x_res, y_res = per_unique(resolution, resolution_pixels)
+    return ((x_res ** 2 + y_res ** 2) ** 0.5 / pd.to_numeric(inches, errors='coerce')).astype(float)
+
+
+def resolution_ppi(resolution, inches):
+    # Single-value ppi for the app's inputs; None when it can't be computed
+    match = RESOLUTION_RE.search(resolution)
+    if match is None or not inches or inches <= 0:
+        return None
+    x_res, y_res = int(match.group(1)), int(match.group(2))
+    return (x_res ** 2 + y_res ** 2) ** 0.5 / float(inches)
+
+
+def cpu_brand(cpu):
+    core_i = cpu.str.extract(CORE_I_RE, expand=False)
+    return pd.Series(np.select(
+        [core_i.notna().to_numpy(), cpu.str.contains(INTEL_RE, na=False).to_numpy()],
+        ['Intel Core ' + core_i.fillna(''), 'Other Intel Processor'],
+        'AMD Processor'), index=cpu.index)
+
+
+def storage(memory):
+    # "128GB SSD +  1TB HDD" -> HDD 1000, SSD 128 (Hybrid and Flash Storage are ignored, as in training)
+    memory = memory.astype(str).str.replace(DECIMAL_ZERO_RE, '', regex=True)
+    memory = memory.str.replace('GB', '', regex=False).str.replace('TB', '000', regex=False)
+    layers = memory.str.split('+', n=1, expand=True).reindex(columns=[0, 1]).astype(str)  # NaN -> 'nan' when there's no '+'
+    hdd = ssd = 0
+    for layer in (layers[0].str.strip(), layers[1]):
+        size = pd.to_numeric(layer.str.extract(NUMBER_RE, expand=False), errors='coerce').fillna(0).astype(int)
+        hdd = hdd + size * layer.str.contains('HDD', regex=False, na=False).astype(int)
+        ssd = ssd + size * layer.str.contains('SSD', regex=False, na=False).astype(int)
+    return hdd, ssd
+
+
+def gpu_brand(gpu):
+    return gpu.str.extract(FIRST_WORD_RE, expand=False)
+
+
+def parse_ram(ram):
+    return pd.to_numeric(ram.astype(str).str.replace(RAM_RE, '', regex=True), errors='coerce')
+
+
+def parse_weight(weight):
+    return pd.to_numeric(weight.astype(str).str.replace(WEIGHT_RE, '', regex=True), errors='coerce').astype('float32')
+
+
+def os_category(opsys):
+    return pd.Series(np.select(
+        [opsys.isin(['Windows 10', 'Windows 7', 'Windows 10 S']), opsys.isin(['macOS', 'Mac OS X'])],
+        ['Windows', 'Mac'],
+        'Others/No OS/Linux'), index=opsys.index)
+
+
+# --- All features ---
+def engineer_features(raw):
+    # Raw listings -> DataFrame with FEATURES columns (same index as `raw`).
+    # Unparseable Ram/Weight/resolution values become NaN instead of raising.
+    features = pd.DataFrame(index=raw.index)
+    features['Company'] = raw['Company']
+    features['TypeName'] = raw['TypeName']
+    features['Ram'] = per_unique(raw['Ram'], parse_ram)
+    features['Weight'] = per_unique(raw['Weight'], parse_weight)
+    features['Touchscreen'], features['Ips'] = per_unique(raw['ScreenResolution'], screen_flags)
+    features['ppi'] = ppi(raw['ScreenResolution'], raw['Inches'])
+    features['Cpu brand'] = per_unique(raw['Cpu'], cpu_brand)
+    features['HDD'], features['SSD'] = per_unique(raw['Memory'], storage)
+    features['Gpu brand'] = per_unique(raw['Gpu'], gpu_brand)
+    features['os'] = per_unique(raw['OpSys'], os_category)
+    return features
+
+
+def training_frame(raw):
+    # laptop_data.csv -> the notebook's `df`: features plus Price, ARM GPUs dropped
+    features = engineer_features(raw)
+    features.insert(4, 'Price', raw['Price'])
+    return features[features['Gpu brand'] != 'ARM']
+
+
+class LaptopFeatures(TransformerMixin, BaseEstimator):
+    # Pipeline stage: raw listings -> the 12 FEATURES columns.
+    #
+    #   pipe = Pipeline([('features', LaptopFeatures()), ('step1', step1), ('step2', step2)])
+    #   pipe.fit(raw_listings, np.log(prices))
+    #
+    # Input that already has the engineered columns (the app's 12-feature query)
+    # is passed through unchanged, so a pipeline built this way serves both.
+
+    def fit(self, X, y=None):
+        return self
+
+    def transform(self, X):
+        if not isinstance(X, pd.DataFrame):
+            X = pd.DataFrame(X, columns=FEATURES)
+        if set(FEATURES).issubset(X.columns):
+            return X[FEATURES]
+        return engineer_features(X)[FEATURES]
+
+    def get_feature_names_out(self, input_features=None):
+        return np.asarray(FEATURES, dtype=object)
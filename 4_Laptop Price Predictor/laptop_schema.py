@@ -0,0 +1,57 @@
+import json
+
+from laptop_features import CATEGORICAL, FEATURES
+from prediction_cache import normalize
+
+# Small metadata artifact for serving, written next to pipe.pkl at training time.
+#
+# The app only needs the category vocabularies (for its dropdowns), the numeric
+# ranges and the most common configurations (to pre-warm the prediction cache),
+# not the whole training DataFrame. schema.json holds exactly that, so df.pkl
+# is only read when the dataset preview is opened.
+#
+#   python laptop_schema.py --df df.pkl --out schema.json   # for an existing df.pkl
+
+SCHEMA_FILE = 'schema.json'
+
+NUMERIC = ['Ram', 'Weight', 'Touchscreen', 'Ips', 'ppi', 'HDD', 'SSD', 'Price']
+
+
+def build_schema(df, max_configurations=256):
+    # Training DataFrame (the notebook's `df`) -> JSON-serializable dict
+    numeric = [col for col in NUMERIC if col in df.columns]
+    configurations = df[FEATURES].value_counts().index[:max_configurations]  # most frequent first
+    return {
+        'features': FEATURES,
+        'rows': len(df),
+        'categories': {col: [str(value) for value in df[col].dropna().unique()] for col in CATEGORICAL},  # in order of appearance
+        'ranges': {col: {'min': round(float(df[col].min()), 4), 'max': round(float(df[col].max()), 4)} for col in numeric},
+        'configurations': [list(normalize(values)) for values in configurations],
+    }
+
+
+def save_schema(schema, path=SCHEMA_FILE):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(schema, f, ensure_ascii=False, separators=(',', ':'))
+
+
+def load_schema(path=SCHEMA_FILE):
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+if __name__ == '__main__':
+    import argparse
+    import os
+    import pickle
+
+    parser = argparse.ArgumentParser(description="Write schema.json from the training DataFrame (df.pkl).")
+    parser.add_argument('--df', default='df.pkl')
+    parser.add_argument('--out', default=SCHEMA_FILE)
+    parser.add_argument('--max-configurations', type=int, default=256, help="configurations kept for cache pre-warming")
+    args = parser.parse_args()
+
+    with open(args.df, 'rb') as f:
+        df = pickle.load(f)
+    save_schema(build_schema(df, args.max_configurations), args.out)
+    print(f"{args.out}: {os.path.getsize(args.out):,} bytes (from {os.path.getsize(args.df):,} bytes of {args.df})")
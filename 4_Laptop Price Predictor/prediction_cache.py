@@ -0,0 +1,121 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+from laptop_features import CATEGORICAL, FEATURES
+
+# LRU cache of price predictions in front of pipe.pkl.
+#
+# The app's inputs are almost all categorical or picked from short lists, so a
+# handful of popular configurations make up most clicks. Queries are normalized
+# to a hashable 12-tuple (in FEATURES order); a hit returns the stored price
+# without running the OneHotEncoder/ColumnTransformer and the model. Misses are
+# predicted on the normalized values, so a cached price is always exactly what
+# the model returns for its key. The cache can be pre-warmed with the most
+# common configurations (from schema.json or df.pkl), most frequent last so
+# they are the last evicted.
+#
+# predict/predict_many return each price with a hit flag (True when the model
+# was skipped), so callers sharing one cache, like the app's sessions, can count
+# their own hits and misses.
+
+WEIGHT_DECIMALS = 2  # the app's weight input has two decimals
+PPI_DECIMALS = 4
+
+
+def normalize(query):
+    # 12 values in FEATURES order (list, tuple, dict, 1-row array) -> hashable key
+    if isinstance(query, dict):
+        query = [query[col] for col in FEATURES]
+    values = dict(zip(FEATURES, np.asarray(query, dtype=object).ravel()))
+    key = []
+    for col in FEATURES:
+        value = values[col]
+        if col in CATEGORICAL:
+            key.append(str(value).strip())
+        elif col == 'Weight':
+            key.append(round(float(value), WEIGHT_DECIMALS))
+        elif col == 'ppi':
+            key.append(round(float(value), PPI_DECIMALS))
+        else:  # Ram, Touchscreen, Ips, HDD, SSD
+            key.append(int(value))
+    return tuple(key)
+
+
+class PredictionCache:
+
+    def __init__(self, pipe, maxsize=4096):
+        self.pipe = pipe
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()  # normalized query -> price
+        self._lock = threading.Lock()
+
+    def _predict(self, keys):
+        # One pipe.predict call for all keys; the model predicts log-price
+        return np.exp(self.pipe.predict(pd.DataFrame(keys, columns=FEATURES)))
+
+    def _store(self, keys, prices):
+        with self._lock:
+            for key, price in zip(keys, prices):
+                self._data[key] = float(price)
+                self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def predict(self, query):
+        # One query -> (price, hit)
+        return self.predict_many([query])[0]
+
+    def predict_many(self, queries):
+        # [(price, hit)] for several queries; only the misses go through the model, in one batch
+        keys = [normalize(query) for query in queries]
+        prices, missing = [], []
+        with self._lock:
+            for key in keys:
+                price = self._data.get(key)
+                if price is None:
+                    missing.append(key)
+                else:
+                    self._data.move_to_end(key)
+                prices.append(price)
+            self.hits += len(keys) - len(missing)
+            self.misses += len(missing)
+
+        if not missing:
+            return [(price, True) for price in prices]
+        unique_missing = list(dict.fromkeys(missing))
+        predicted = dict(zip(unique_missing, self._predict(unique_missing)))
+        self._store(unique_missing, [predicted[key] for key in unique_missing])
+        return [(float(predicted[key]), False) if price is None else (price, True) for key, price in zip(keys, prices)]
+
+    def prewarm(self, configurations, limit=None):
+        # Predicts configurations in one batch: a DataFrame such as df.pkl (its distinct
+        # rows are used) or a list of 12-value queries, most frequent first (schema.json).
+        # Returns the number of entries added.
+        if isinstance(configurations, pd.DataFrame):
+            configurations = configurations[FEATURES].value_counts().index  # most frequent first
+        keys = list(dict.fromkeys(normalize(values) for values in configurations))
+        keys = keys[:min(limit or self.maxsize, self.maxsize)]
+        if not keys:
+            return 0
+        prices = self._predict(keys)
+        self._store(keys[::-1], prices[::-1])  # most frequent inserted last = most recently used
+        return len(keys)
+
+    def stats(self):
+        with self._lock:
+            requests = self.hits + self.misses
+            return {'hits': self.hits, 'misses': self.misses, 'size': len(self._data), 'maxsize': self.maxsize,
+                    'hit_rate': self.hits / requests if requests else 0.0}
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+            self.hits = self.misses = 0
+
+    def __len__(self):
+        return len(self._data)
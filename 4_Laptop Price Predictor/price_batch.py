@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+
+from laptop_features import CATEGORICAL, FEATURES, RAW_COLUMNS, engineer_features
+
+# Bulk price prediction for whole catalogs.
+#
+# A CSV of raw listings (the columns of laptop_data.csv, Price optional) is read
+# in chunks; every chunk goes through the vectorized feature engineering and a
+# single pipe.predict call, and is appended to the output CSV with a
+# `Predicted Price` column. Rows the model cannot price (unparseable values or a
+# brand/CPU/GPU/OS category the encoder never saw, e.g. ARM GPUs) get an empty
+# price instead of failing the whole run.
+#
+#   python price_batch.py catalog.csv priced_catalog.csv --chunksize 100000
+
+CHUNKSIZE = 100_000
+
+
+def missing_columns(source):
+    # Reads only the header; rewinds file objects so the data can be read afterwards.
+    columns = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, 'seek'):
+        source.seek(0)
+    return [col for col in RAW_COLUMNS if col not in columns]
+
+
+def known_categories(pipe):
+    # {feature: set of categories} for every one-hot encoded column of the pipeline
+    categories = {}
+    for _, transformer, columns in pipe.named_steps['step1'].transformers_:
+        if hasattr(transformer, 'categories_'):
+            for column, values in zip(columns, transformer.categories_):
+                categories[FEATURES[column] if isinstance(column, (int, np.integer)) else column] = set(values)
+    return categories
+
+
+def predictable(features, categories):
+    # Boolean mask of the rows the pipeline can score
+    mask = features[FEATURES].notna().all(axis=1)
+    for column in CATEGORICAL:
+        if column in categories:
+            mask &= features[column].isin(categories[column])
+    return mask
+
+
+def predict_prices(raw, pipe, categories=None):
+    # Raw listings -> Series of prices in rupees (NaN where the row can't be priced)
+    features = engineer_features(raw)
+    mask = predictable(features, known_categories(pipe) if categories is None else categories)
+    prices = pd.Series(np.nan, index=raw.index, name='Predicted Price')
+    if mask.any():
+        prices[mask] = np.exp(pipe.predict(features.loc[mask, FEATURES]))  # model predicts log-price
+    return prices
+
+
+def read_chunks(source, chunksize=CHUNKSIZE):
+    yield from pd.read_csv(source, chunksize=chunksize)
+
+
+def write_prices(source, out, pipe, chunksize=CHUNKSIZE, preview_rows=1000):
+    # Streams priced listings for `source` into the CSV file (path or text file) `out`.
+    # Returns the number of rows written, how many of them got a price, and a preview.
+    categories = known_categories(pipe)
+    rows, priced, preview = 0, 0, None
+    for chunk in read_chunks(source, chunksize):
+        if chunk.empty:
+            continue
+        chunk['Predicted Price'] = predict_prices(chunk, pipe, categories).round(2)
+        chunk.to_csv(out, index=False, header=(rows == 0), mode='w' if rows == 0 else 'a')
+        if preview is None:
+            preview = chunk.head(preview_rows)
+        rows += len(chunk)
+        priced += int(chunk['Predicted Price'].notna().sum())
+    return rows, priced, preview
+
+
+if __name__ == '__main__':
+    import argparse
+    import pickle
+    import time
+
+    parser = argparse.ArgumentParser(description="Predict prices for a CSV of raw laptop listings.")
+    parser.add_argument('input', help="CSV with the columns of laptop_data.csv")
+    parser.add_argument('output', help="where to write the CSV with a Predicted Price column")
+    parser.add_argument('--model', default='pipe.pkl')
+    parser.add_argument('--chunksize', type=int, default=CHUNKSIZE)
+    args = parser.parse_args()
+
+    missing = missing_columns(args.input)
+    if missing:
+        raise SystemExit(f"Missing columns: {', '.join(missing)}")
+
+    with open(args.model, 'rb') as f:
+        pipe = pickle.load(f)
+
+    start = time.perf_counter()
+    rows, priced, _ = write_prices(args.input, args.output, pipe, args.chunksize)
+    seconds = time.perf_counter() - start
+    print(f"{rows} listings ({priced} priced) written to {args.output} in {seconds:.1f}s ({rows / seconds:,.0f} rows/s)")
@@ -0,0 +1,81 @@
+import threading
+import unittest
+
+import numpy as np
+
+from laptop_features import FEATURES
+from prediction_cache import PredictionCache
+
+# PredictionCache against a stub pipeline: the hit flag returned with each
+# price, batching of misses, and per-call flags under concurrent callers.
+#
+#   python -m unittest test_prediction_cache -v
+
+QUERY = ['Dell', 'Notebook', 8, 2.2, 0, 0, 141.21, 'Intel Core i5', 1000, 0, 'Intel', 'Windows']
+OTHER = ['Apple', 'Ultrabook', 8, 1.37, 0, 1, 226.98, 'Intel Core i5', 0, 128, 'Intel', 'Mac']
+
+
+class StubPipe:
+    # log-price = Ram; records the rows of every predict call
+
+    def __init__(self):
+        self.calls = []
+
+    def predict(self, df):
+        self.calls.append(len(df))
+        return np.log(df['Ram'].to_numpy(dtype=float) * 1000)
+
+
+class PredictionCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.pipe = StubPipe()
+        self.cache = PredictionCache(self.pipe, maxsize=8)
+
+    def test_hit_flag(self):
+        price, hit = self.cache.predict(QUERY)
+        self.assertAlmostEqual(price, 8000)
+        self.assertFalse(hit)
+        self.assertEqual(self.cache.predict(QUERY), (price, True))
+        self.assertTrue(self.cache.predict(dict(zip(FEATURES, QUERY)))[1])  # same normalized key
+        self.assertEqual(self.pipe.calls, [1])
+
+    def test_predict_many_batches_misses(self):
+        self.cache.predict(QUERY)
+        results = self.cache.predict_many([QUERY, OTHER, OTHER])
+        self.assertEqual([hit for _, hit in results], [True, False, False])
+        self.assertEqual(self.pipe.calls, [1, 1])  # OTHER predicted once
+        self.assertEqual((self.cache.stats()['hits'], self.cache.stats()['misses']), (1, 3))
+
+    def test_prewarmed_queries_hit(self):
+        self.assertEqual(self.cache.prewarm([QUERY, OTHER]), 2)
+        self.assertEqual([hit for _, hit in self.cache.predict_many([OTHER, QUERY])], [True, True])
+
+    def test_flags_are_per_call(self):
+        # Other threads' misses never show up in this caller's flags
+        queries = [QUERY[:2] + [ram] + QUERY[3:] for ram in [2, 4, 6, 8, 12, 16, 24, 32]]
+        for query in queries[:4]:
+            self.cache.predict(query)
+        flags, lock = {}, threading.Lock()
+
+        def worker(n):
+            for i in range(50):
+                query = queries[(n + i) % len(queries)]
+                _, hit = self.cache.predict(query)
+                with lock:
+                    flags.setdefault(tuple(query), []).append(hit)
+
+        threads = [threading.Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        for query in queries[:4]:
+            self.assertTrue(all(flags[tuple(query)]))
+        stats = self.cache.stats()
+        self.assertEqual(sum(hit for hits in flags.values() for hit in hits), stats['hits'])
+        self.assertEqual(sum(not hit for hits in flags.values() for hit in hits), stats['misses'] - 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
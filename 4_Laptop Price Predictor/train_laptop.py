@@ -0,0 +1,188 @@
+import argparse
+import json
+import os
+import pickle
+import time
+import warnings
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+from sklearn.compose import ColumnTransformer
+from sklearn.ensemble import (AdaBoostRegressor, ExtraTreesRegressor, GradientBoostingRegressor,
+                              RandomForestRegressor, StackingRegressor, VotingRegressor)
+from sklearn.linear_model import Lasso, LinearRegression, Ridge
+from sklearn.metrics import mean_absolute_error, r2_score
+from sklearn.model_selection import KFold, cross_validate, train_test_split
+from sklearn.neighbors import KNeighborsRegressor
+from sklearn.pipeline import Pipeline
+from sklearn.preprocessing import OneHotEncoder
+from sklearn.svm import SVR
+from sklearn.tree import DecisionTreeRegressor
+
+from laptop_features import CATEGORICAL, FEATURES, training_frame
+from laptop_schema import build_schema, save_schema
+
+try:
+    from xgboost import XGBRegressor
+except ImportError:  # optional: XGBoost candidates are skipped without it
+    XGBRegressor = None
+
+# Model selection for the laptop price pipeline (the regressors of Code.ipynb as a CLI).
+#
+# The OneHotEncoder ColumnTransformer is fitted and applied once; every
+# candidate regressor is then cross-validated on that cached matrix in a process
+# pool, instead of re-encoding the same rows for each model and fold. The best
+# candidate by mean CV R2 is refit as Pipeline([step1, step2]) on the training
+# split and written to pipe.pkl together with df.pkl, schema.json and a
+# leaderboard.json of CV accuracy and fit/score timings for every candidate.
+#
+#   python train_laptop.py --data laptop_data.csv --out-dir . --workers 8
+#   python train_laptop.py --families Ridge "Random Forest" --folds 3
+
+SPLIT_STATE = 2   # train_test_split(random_state=2), as in the notebook
+MODEL_STATE = 3   # random_state of the notebook's forests
+
+
+def make_step1():
+    return ColumnTransformer(transformers=[
+        ('col_tnf', OneHotEncoder(sparse_output=False, drop='first'), [FEATURES.index(col) for col in CATEGORICAL])
+    ], remainder='passthrough')
+
+
+def candidates():
+    # [(family, estimator)]: the notebook's models plus a small grid around each
+    grid = [('Linear Regression', LinearRegression())]
+    grid += [('Ridge', Ridge(alpha=a)) for a in [1, 10, 100]]
+    grid += [('Lasso', Lasso(alpha=a)) for a in [0.0001, 0.001, 0.01]]
+    grid += [('KNN', KNeighborsRegressor(n_neighbors=k)) for k in [3, 5, 7]]
+    grid += [('Decision Tree', DecisionTreeRegressor(max_depth=d, random_state=MODEL_STATE)) for d in [6, 8, 10, 12]]
+    grid += [('SVM', SVR(kernel='rbf', C=c, epsilon=0.1)) for c in [100, 1000, 10000]]
+    grid += [('Random Forest', RandomForestRegressor(n_estimators=100, random_state=MODEL_STATE, max_samples=0.5,
+                                                     max_features=f, max_depth=d))
+             for f in [0.5, 0.75] for d in [10, 15]]
+    grid += [('Extra Trees', ExtraTreesRegressor(n_estimators=100, random_state=MODEL_STATE, max_samples=0.5,
+                                                 max_features=f, max_depth=d, bootstrap=True))
+             for f in [0.5, 0.75] for d in [10, 15]]
+    grid += [('AdaBoost', AdaBoostRegressor(n_estimators=n, learning_rate=1.0, random_state=MODEL_STATE)) for n in [15, 50]]
+    grid += [('Gradient Boosting', GradientBoostingRegressor(n_estimators=n, random_state=MODEL_STATE)) for n in [100, 500]]
+    if XGBRegressor is not None:
+        grid += [('XGBoost', XGBRegressor(n_estimators=45, max_depth=5, learning_rate=0.5)),
+                 ('XGBoost', XGBRegressor(n_estimators=25, max_depth=5, learning_rate=0.3))]
+
+    # The notebook's ensembles (pipe.pkl has been the Voting Regressor)
+    rf = RandomForestRegressor(n_estimators=350, random_state=MODEL_STATE, max_samples=0.5, max_features=0.75, max_depth=15)
+    gbdt = GradientBoostingRegressor(n_estimators=100, max_features=0.5, random_state=MODEL_STATE)
+    et = ExtraTreesRegressor(n_estimators=100, random_state=MODEL_STATE, max_samples=0.5, max_features=0.75,
+                             max_depth=10, bootstrap=True)
+    voting, weights = [('rf', rf), ('gbdt', gbdt)], [5, 1]
+    stacking = [('rf', rf), ('gbdt', gbdt)]
+    if XGBRegressor is not None:
+        xgb = XGBRegressor(n_estimators=25, learning_rate=0.3, max_depth=5)
+        voting, weights = voting + [('xgb', xgb)], weights + [1]
+        stacking = stacking + [('xgb', xgb)]
+    grid += [('Voting', VotingRegressor(voting + [('et', et)], weights=weights + [1])),
+             ('Stacking', StackingRegressor(estimators=stacking, final_estimator=Ridge(alpha=100)))]
+    return grid
+
+
+# --- Candidate evaluation (runs in worker processes on the cached encoded matrix) ---
+_X = _y = _cv = None
+
+
+def _init_worker(X, y, folds):
+    global _X, _y, _cv
+    _X, _y = X, y
+    _cv = KFold(n_splits=folds, shuffle=True, random_state=SPLIT_STATE)
+    warnings.filterwarnings('ignore')
+
+
+def _evaluate(job):
+    index, family, estimator = job
+    start = time.perf_counter()
+    scores = cross_validate(estimator, _X, _y, cv=_cv, scoring=('r2', 'neg_mean_absolute_error'))
+    return {
+        'index': index,
+        'family': family,
+        'model': ' '.join(repr(estimator).split()),  # one line, non-default parameters only
+        'cv_r2': float(scores['test_r2'].mean()),
+        'cv_r2_std': float(scores['test_r2'].std()),
+        'cv_mae': float(-scores['test_neg_mean_absolute_error'].mean()),
+        'fit_seconds': float(scores['fit_time'].mean()),
+        'score_seconds': float(scores['score_time'].mean()),
+        'total_seconds': time.perf_counter() - start,
+    }
+
+
+def search(X_encoded, y, jobs, folds=5, workers=None):
+    # Largest models first, so the pool isn't left waiting on one slow ensemble at the end
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(X_encoded, y, folds)) as executor:
+        results = list(executor.map(_evaluate, jobs[::-1]))
+    return sorted(results, key=lambda r: r['cv_r2'], reverse=True)
+
+
+def train(data='laptop_data.csv', out_dir='.', folds=5, workers=None, families=None):
+    df = training_frame(pd.read_csv(data))
+    X = df.drop(columns=['Price'])
+    y = np.log(df['Price'])  # log transform, as in the notebook
+    X_train, X_test, y_train, y_test = train_test_split(X, y, test_size=0.15, random_state=SPLIT_STATE)
+
+    # Encoded once; every candidate and fold reuses this matrix
+    start = time.perf_counter()
+    X_encoded = make_step1().fit_transform(X_train)
+    encode_seconds = time.perf_counter() - start
+
+    grid = [(family, estimator) for family, estimator in candidates() if not families or family in families]
+    if not grid:
+        raise ValueError(f"No candidates for families {families}")
+    jobs = [(index, family, estimator) for index, (family, estimator) in enumerate(grid)]
+
+    start = time.perf_counter()
+    leaderboard = search(X_encoded, y_train.to_numpy(), jobs, folds, workers)
+    search_seconds = time.perf_counter() - start
+
+    best = leaderboard[0]
+    pipe = Pipeline([('step1', make_step1()), ('step2', grid[best['index']][1])])
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        pipe.fit(X_train, y_train)
+    y_pred = pipe.predict(X_test)
+
+    with open(os.path.join(out_dir, 'pipe.pkl'), 'wb') as f:
+        pickle.dump(pipe, f)
+    with open(os.path.join(out_dir, 'df.pkl'), 'wb') as f:
+        pickle.dump(df, f)
+    save_schema(build_schema(df), os.path.join(out_dir, 'schema.json'))
+
+    summary = {'data': os.path.basename(data), 'folds': folds, 'candidates': len(grid),
+               'xgboost': XGBRegressor is not None, 'encode_seconds': round(encode_seconds, 4),
+               'search_seconds': round(search_seconds, 2),
+               'best': {'family': best['family'], 'model': best['model'],
+                        'test_r2': round(float(r2_score(y_test, y_pred)), 4),
+                        'test_mae': round(float(mean_absolute_error(y_test, y_pred)), 4)},
+               'leaderboard': [{key: round(value, 4) if isinstance(value, float) else value
+                                for key, value in result.items() if key != 'index'} for result in leaderboard]}
+    with open(os.path.join(out_dir, 'leaderboard.json'), 'w') as f:
+        json.dump(summary, f, indent=2)
+    return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Cross-validate the laptop price regressors and save the best pipeline.")
+    parser.add_argument('--data', default='laptop_data.csv')
+    parser.add_argument('--out-dir', default='.')
+    parser.add_argument('--folds', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=None, help="processes (default: all cores)")
+    parser.add_argument('--families', nargs='+', default=None, help="only these model families, e.g. Ridge 'Random Forest'")
+    args = parser.parse_args()
+
+    if XGBRegressor is None:
+        print("xgboost is not installed: XGBoost candidates are skipped")
+    summary = train(args.data, args.out_dir, args.folds, args.workers, args.families)
+
+    print(f"{'family':<18} {'cv R2':>7} {'± std':>6} {'cv MAE':>7} {'fit s':>7}  model")
+    for r in summary['leaderboard']:
+        print(f"{r['family']:<18} {r['cv_r2']:>7.4f} {r['cv_r2_std']:>6.4f} {r['cv_mae']:>7.4f} {r['fit_seconds']:>7.3f}  {r['model']}")
+    best = summary['best']
+    print(f"Best: {best['model']} (test R2 {best['test_r2']}, MAE {best['test_mae']}); "
+          f"search took {summary['search_seconds']}s, written pipe.pkl, df.pkl, schema.json and leaderboard.json to {args.out_dir}")
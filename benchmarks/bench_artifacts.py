@@ -0,0 +1,158 @@
+import os
+import pickle
+import shutil
+import sys
+import warnings
+
+import numpy as np
+import pandas as pd
+
+# Artifacts for the benchmark suite, trained from the bundled data.
+#
+# The trained pickles are not committed, so every predictor gets a quick but
+# representative model here, written in the layout its app loads:
+#   movies/  movies_dict.pkl, neighbors.npz (synthetic catalog, see ann_recall.py)
+#   spam/    vectorizer.pkl, model.pkl      (TF-IDF 3000 + MultinomialNB, as in Code.ipynb)
+#   heart/   the four MODEL_FILES           (notebook model families, fixed parameters)
+#   laptop/  pipe.pkl, schema.json          (the notebook's Voting Regressor)
+# Existing directories are reused, so the artifacts are built once per work dir.
+#
+#   python benchmarks/bench_artifacts.py --out /tmp/bench-artifacts
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROJECTS = {
+    'movies': '1_Movie Recommender',
+    'spam': '2_Email Spam Classifier',
+    'heart': '3_Heart Disease Predictor',
+    'laptop': '4_Laptop Price Predictor',
+}
+
+DATA = {
+    'spam': os.path.join(ROOT, PROJECTS['spam'], 'spam.csv'),
+    'heart': os.path.join(ROOT, PROJECTS['heart'], 'heart.csv'),
+    'laptop': os.path.join(ROOT, PROJECTS['laptop'], 'laptop_data.csv'),
+}
+
+MOVIE_CATALOG = 5000  # about the size of the TMDB 5000 catalog
+
+for _directory in [*PROJECTS.values(), 'common']:
+    if os.path.join(ROOT, _directory) not in sys.path:
+        sys.path.append(os.path.join(ROOT, _directory))
+
+
+def _dump(obj, path):
+    with open(path, 'wb') as f:
+        pickle.dump(obj, f)
+
+
+# --- Sample inputs (also used by run_benchmarks.py) ---
+def movie_titles(n_movies=MOVIE_CATALOG):
+    return [f"Movie {i}" for i in range(n_movies)]
+
+
+def spam_messages():
+    df = pd.read_csv(DATA['spam'], encoding='ISO-8859-1', usecols=['v1', 'v2'])
+    return df.rename(columns={'v1': 'target', 'v2': 'text'}).drop_duplicates(keep='first')
+
+
+def heart_patients():
+    from train_heart import load_heart_data
+    return load_heart_data(DATA['heart'])
+
+
+def laptop_frame():
+    from laptop_features import training_frame
+    return training_frame(pd.read_csv(DATA['laptop']))
+
+
+# --- Builders ---
+def build_movies(out, n_movies=MOVIE_CATALOG):
+    from ann_recall import synthetic_vectors
+    from neighbor_index import build_neighbor_index, save_neighbor_index
+
+    _dump({'movie_id': list(range(n_movies)), 'title': movie_titles(n_movies)}, os.path.join(out, 'movies_dict.pkl'))
+    save_neighbor_index(build_neighbor_index(synthetic_vectors(n_movies)), os.path.join(out, 'neighbors.npz'))
+
+
+def build_spam(out):
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.naive_bayes import MultinomialNB
+    from text_preprocessing import transform_text
+
+    df = spam_messages()
+    tfidf = TfidfVectorizer(max_features=3000)
+    X = tfidf.fit_transform(df['text'].map(transform_text)).toarray()
+    _dump(tfidf, os.path.join(out, 'vectorizer.pkl'))
+    _dump(MultinomialNB().fit(X, (df['target'] == 'spam').astype(int)), os.path.join(out, 'model.pkl'))
+
+
+def build_heart(out):
+    from model_pool import MODEL_FILES
+    from sklearn.ensemble import RandomForestClassifier
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.svm import SVC
+    from sklearn.tree import DecisionTreeClassifier
+    from train_heart import RANDOM_STATE
+
+    df = heart_patients()
+    X, y = df.drop('HeartDisease', axis=1), df['HeartDisease']
+    models = {
+        'Logistic Regression': LogisticRegression(solver='liblinear'),
+        'Support Vector Machine': SVC(kernel='linear'),
+        'Decision Tree': DecisionTreeClassifier(max_depth=5, random_state=RANDOM_STATE),
+        'Random Forest': RandomForestClassifier(n_estimators=200, max_depth=9, random_state=RANDOM_STATE),
+    }
+    for name, model in models.items():
+        _dump(model.fit(X, y), os.path.join(out, MODEL_FILES[name]))
+
+
+def build_laptop(out):
+    from laptop_schema import build_schema, save_schema
+    from sklearn.pipeline import Pipeline
+    from train_laptop import candidates, make_step1
+
+    df = laptop_frame()
+    voting = dict(candidates())['Voting']
+    pipe = Pipeline([('step1', make_step1()), ('step2', voting)])
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        pipe.fit(df.drop(columns=['Price']), np.log(df['Price']))
+    _dump(pipe, os.path.join(out, 'pipe.pkl'))
+    save_schema(build_schema(df), os.path.join(out, 'schema.json'))
+
+
+BUILDERS = {
+    'movies': build_movies,
+    'spam': build_spam,
+    'heart': build_heart,
+    'laptop': build_laptop,
+}
+
+
+def prepare(work_dir, names=None, log=print):
+    # {name: artifact directory}, building whatever is missing
+    directories = {}
+    for name in names or BUILDERS:
+        directory = os.path.join(work_dir, name)
+        if not os.path.isdir(directory) or not os.listdir(directory):
+            os.makedirs(directory, exist_ok=True)
+            log(f"{name}: training benchmark artifacts in {directory}")
+            try:
+                BUILDERS[name](directory)
+            except BaseException:  # never leave a half-built directory to be reused next run
+                shutil.rmtree(directory, ignore_errors=True)
+                raise
+        directories[name] = directory
+    return directories
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Train the benchmark artifacts for the four predictors.")
+    parser.add_argument('--out', required=True, help="work directory, one sub-directory per predictor")
+    parser.add_argument('--only', nargs='+', choices=list(BUILDERS), default=None)
+    args = parser.parse_args()
+    for name, directory in prepare(args.out, args.only).items():
+        print(f"{name}: {', '.join(sorted(os.listdir(directory)))}")
@@ -0,0 +1,321 @@
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+
+import numpy as np
+
+from bench_artifacts import PROJECTS, ROOT, heart_patients, laptop_frame, movie_titles, prepare, spam_messages
+
+# Latency, throughput and memory benchmarks for the four predictors.
+#
+# Every predictor runs in its own fresh Python process, so artifact load time
+# and peak RSS are its own and not the previous predictor's. Each one reports:
+#   load_seconds            artifacts loaded the way the app loads them: load_artifact, so
+#                           .mmap conversions in the artifact directory are used (imports included)
+#   single_ms p50/p99/mean  one item through the app's single-prediction path
+#   batch items_per_second  the batch path at several batch sizes
+#   rss_mb                  resident memory before/after loading, and the peak
+# Results are written as JSON with the git commit and library versions;
+# --baseline compares a run with an earlier one and exits 1 on a regression.
+#
+#   python benchmarks/run_benchmarks.py --out results.json
+#   python benchmarks/run_benchmarks.py --only spam heart --baseline results.json --tolerance 0.15
+#   python benchmarks/run_benchmarks.py --compare old.json new.json
+
+BATCH_SIZES = [1, 16, 128, 1024]
+
+
+# --- Predictors: load(directory) -> model, single(model, item), batch(model, items), samples() ---
+class MovieBench:
+    # recommend(): title -> the 5 most similar titles from the precomputed neighbour index
+
+    @staticmethod
+    def load(directory):
+        import pandas as pd
+        from mmap_artifacts import load_artifact
+        from neighbor_index import load_neighbor_index
+        from recommender import Recommender
+
+        movies = pd.DataFrame(load_artifact(os.path.join(directory, 'movies_dict.pkl')))
+        index = load_neighbor_index(os.path.join(directory, 'neighbors.npz'), load_artifact)
+        return Recommender(movies['title'].values, index=index)
+
+    @staticmethod
+    def samples():
+        return movie_titles()
+
+    @staticmethod
+    def single(recommender, title):
+        return recommender.recommend(title)
+
+    @staticmethod
+    def batch(recommender, titles):
+        return recommender.recommend_many(titles)
+
+
+class SpamBench:
+    # transform_text() + tfidf.transform + model.predict, as in the app
+
+    @staticmethod
+    def load(directory):
+        from mmap_artifacts import load_artifact
+        from model_registry import ModelRegistry
+        return ModelRegistry(os.path.join(directory, 'vectorizer.pkl'), os.path.join(directory, 'model.pkl'),
+                             load_artifact).load().warm_up()
+
+    @staticmethod
+    def samples():
+        return spam_messages()['text'].tolist()
+
+    @staticmethod
+    def single(registry, message):
+        from text_preprocessing import transform_text
+        return registry.model.predict(registry.tfidf.transform([transform_text(message)]))[0]
+
+    @staticmethod
+    def batch(registry, messages):
+        from spam_batch import score_batch
+        from text_preprocessing import transform_text
+        return score_batch(registry.tfidf, registry.model, [transform_text(message) for message in messages])
+
+
+class HeartBench:
+    # predict_heart_disease(): one patient through the four models
+
+    @staticmethod
+    def load(directory):
+        from mmap_artifacts import load_artifact
+        from model_pool import MODEL_FILES, ModelPool
+        return ModelPool.load({name: os.path.join(directory, file) for name, file in MODEL_FILES.items()},
+                              loader=load_artifact)
+
+    @staticmethod
+    def samples():
+        return heart_patients().drop(columns=['HeartDisease'])
+
+    @staticmethod
+    def single(pool, patient):
+        return [pred[0] for pred in pool.predict_all(patient).values()]
+
+    @staticmethod
+    def batch(pool, patients):
+        return pool.predict_all(patients)
+
+
+class LaptopBench:
+    # pipe.predict on the app's 12 features (no prediction cache)
+
+    @staticmethod
+    def load(directory):
+        from mmap_artifacts import load_artifact
+        return load_artifact(os.path.join(directory, 'pipe.pkl'))
+
+    @staticmethod
+    def samples():
+        from laptop_features import FEATURES
+        return laptop_frame()[FEATURES]
+
+    @staticmethod
+    def single(pipe, query):
+        return int(np.exp(pipe.predict(query)[0]))
+
+    @staticmethod
+    def batch(pipe, queries):
+        return np.exp(pipe.predict(queries))
+
+
+BENCHES = {
+    'movies': MovieBench,
+    'spam': SpamBench,
+    'heart': HeartBench,
+    'laptop': LaptopBench,
+}
+
+
+# --- Measurement (runs in the child process) ---
+def current_rss_mb():
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / 2**20
+    except OSError:  # not Linux
+        return None
+
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2**20 if sys.platform == 'darwin' else peak / 2**10  # bytes on macOS, KiB on Linux
+
+
+def take(samples, positions):
+    # Rows of a DataFrame (single items stay 1-row frames) or items of a list
+    if hasattr(samples, 'iloc'):
+        return samples.iloc[positions]
+    return [samples[i] for i in positions]
+
+
+def percentiles(seconds):
+    ms = np.asarray(seconds) * 1000
+    return {'p50': round(float(np.percentile(ms, 50)), 4), 'p99': round(float(np.percentile(ms, 99)), 4),
+            'mean': round(float(ms.mean()), 4)}
+
+
+def measure(name, directory, repeat=300, sizes=BATCH_SIZES, min_seconds=0.5):
+    bench = BENCHES[name]
+    rss_before = current_rss_mb()
+    start = time.perf_counter()
+    model = bench.load(directory)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = current_rss_mb()
+
+    samples = bench.samples()
+    n = len(samples)
+    for i in range(min(10, n)):  # warm-up: lazy imports, first-call caches
+        bench.single(model, take(samples, [i]) if hasattr(samples, 'iloc') else samples[i])
+
+    single = []
+    for i in range(repeat):
+        item = take(samples, [i % n]) if hasattr(samples, 'iloc') else samples[i % n]
+        start = time.perf_counter()
+        bench.single(model, item)
+        single.append(time.perf_counter() - start)
+
+    batch = {}
+    for size in sizes:
+        items = take(samples, np.arange(size) % n)
+        runs, start = 0, time.perf_counter()
+        while runs < 3 or time.perf_counter() - start < min_seconds:
+            bench.batch(model, items)
+            runs += 1
+        elapsed = time.perf_counter() - start
+        batch[str(size)] = {'runs': runs, 'ms_per_batch': round(elapsed * 1000 / runs, 4),
+                            'items_per_second': round(size * runs / elapsed, 1)}
+
+    return {
+        'load_seconds': round(load_seconds, 4),
+        'single_ms': percentiles(single),
+        'single_repeat': repeat,
+        'batch': batch,
+        'rss_mb': {'before_load': rss_before and round(rss_before, 1), 'after_load': rss_loaded and round(rss_loaded, 1),
+                   'peak': round(peak_rss_mb(), 1)},
+    }
+
+
+# --- Orchestration (parent process) ---
+def run_isolated(name, directory, repeat, sizes, min_seconds):
+    command = [sys.executable, os.path.abspath(__file__), '--child', name, '--artifacts', directory,
+               '--repeat', str(repeat), '--min-seconds', str(min_seconds), '--sizes', *map(str, sizes)]
+    completed = subprocess.run(command, capture_output=True, text=True)
+    if completed.returncode != 0:
+        raise RuntimeError(f"{name} benchmark failed:\n{completed.stderr}")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def environment():
+    import pandas
+    import sklearn
+
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True,
+                                text=True).stdout.strip() or None
+    except OSError:
+        commit = None
+    return {'timestamp': datetime.now(timezone.utc).isoformat(timespec='seconds'), 'commit': commit,
+            'python': platform.python_version(), 'platform': platform.platform(), 'cpus': os.cpu_count(),
+            'numpy': np.__version__, 'pandas': pandas.__version__, 'scikit-learn': sklearn.__version__}
+
+
+# (path in a result, True when larger is better)
+COMPARED = [(('load_seconds',), False), (('single_ms', 'p50'), False), (('single_ms', 'p99'), False),
+            (('rss_mb', 'peak'), False)]
+
+
+def compare(baseline, current, tolerance=0.10):
+    # [(predictor, metric, before, after, change, regressed)] for every metric in both runs
+    rows = []
+    for name, result in current['results'].items():
+        before_result = baseline['results'].get(name)
+        if before_result is None:
+            continue
+        metrics = COMPARED + [(('batch', size, 'items_per_second'), True) for size in result['batch']]
+        for path, higher_is_better in metrics:
+            before, after = before_result, result
+            for key in path:
+                before, after = (before or {}).get(key), (after or {}).get(key)
+            if not before or after is None:
+                continue
+            change = after / before - 1
+            regressed = change < -tolerance if higher_is_better else change > tolerance
+            rows.append((name, '.'.join(path), before, after, change, regressed))
+    return rows
+
+
+def print_results(results):
+    print(f"{'predictor':<8} {'load s':>7} {'p50 ms':>8} {'p99 ms':>8} {'peak MB':>8}  batch items/s")
+    for name, r in results.items():
+        batch = '  '.join(f"{size}: {b['items_per_second']:,.0f}" for size, b in r['batch'].items())
+        print(f"{name:<8} {r['load_seconds']:>7.3f} {r['single_ms']['p50']:>8.3f} {r['single_ms']['p99']:>8.3f} "
+              f"{r['rss_mb']['peak']:>8.1f}  {batch}")
+
+
+def print_comparison(rows, tolerance):
+    for name, metric, before, after, change, regressed in rows:
+        flag = 'REGRESSION' if regressed else ''
+        print(f"{name:<8} {metric:<34} {before:>12,.4f} -> {after:>12,.4f} {change:>+8.1%}  {flag}")
+    regressions = sum(row[-1] for row in rows)
+    print(f"{regressions} regression(s) beyond {tolerance:.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the four predictors: latency, throughput, load time, memory.")
+    parser.add_argument('--out', default='benchmark_results.json')
+    parser.add_argument('--work-dir', default=os.path.join(ROOT, 'benchmarks', '.artifacts'),
+                        help="where the benchmark models are trained and cached")
+    parser.add_argument('--only', nargs='+', choices=list(BENCHES), default=None)
+    parser.add_argument('--repeat', type=int, default=300, help="single-item calls per predictor")
+    parser.add_argument('--sizes', type=int, nargs='+', default=BATCH_SIZES, help="batch sizes")
+    parser.add_argument('--min-seconds', type=float, default=0.5, help="minimum time per batch size")
+    parser.add_argument('--baseline', default=None, help="earlier results to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.10, help="relative change counted as a regression")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="only compare two result files")
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    parser.add_argument('--artifacts', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.artifacts, args.repeat, args.sizes, args.min_seconds)))
+        return
+
+    if args.compare:
+        with open(args.compare[0]) as f, open(args.compare[1]) as g:
+            baseline, current = json.load(f), json.load(g)
+        sys.exit(1 if print_comparison(compare(baseline, current, args.tolerance), args.tolerance) else 0)
+
+    directories = prepare(args.work_dir, args.only)
+    results = {}
+    for name, directory in directories.items():
+        print(f"{name}: benchmarking ({PROJECTS[name]})")
+        results[name] = run_isolated(name, directory, args.repeat, args.sizes, args.min_seconds)
+
+    report = {'environment': environment(), 'settings': {'repeat': args.repeat, 'sizes': args.sizes,
+                                                         'min_seconds': args.min_seconds},
+              'results': results}
+    with open(args.out, 'w') as f:
+        json.dump(report, f, indent=2)
+    print_results(results)
+    print(f"Results written to {args.out}")
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        sys.exit(1 if print_comparison(compare(baseline, report, args.tolerance), args.tolerance) else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,186 @@
+import atexit
+import cProfile
+import io
+import json
+import math
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+from functools import wraps
+
+# Per-stage timing histograms, counters and one-off cProfile captures for the
+# hot paths of the four apps and the inference server.
+#
+# Off by default, and then close to free: stage() hands back one shared no-op
+# context manager and @timed returns the function itself. Switched on by
+# environment variables, read once at import:
+#   ML_INSTRUMENT=1          record every stage: count, total, min/max and a log2 histogram
+#   ML_INSTRUMENT_OUT=x.json write the snapshot to x.json when the process exits
+#   ML_PROFILE_DIR=profiles  cProfile the first call of every profile_once() label
+#                            (e.g. the first prediction) into profiles/<label>-<pid>-<time>.prof and .txt
+#
+#   ML_INSTRUMENT=1 ML_INSTRUMENT_OUT=stages.json streamlit run frontend.py
+#   ML_PROFILE_DIR=/tmp/profiles python serving/server.py
+
+ENABLED = os.environ.get('ML_INSTRUMENT', '').lower() in ('1', 'true', 'yes', 'on')
+OUT = os.environ.get('ML_INSTRUMENT_OUT') or None
+PROFILE_DIR = os.environ.get('ML_PROFILE_DIR') or None
+
+BUCKETS = 40  # bucket i holds durations in [2**i, 2**(i+1)) microseconds (bucket 0 also anything faster)
+
+_NULL = nullcontext()
+
+
+class Histogram:
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.min = math.inf
+        self.max = 0.0
+        self.buckets = [0] * BUCKETS
+
+    def record(self, seconds):
+        self.count += 1
+        self.total += seconds
+        self.min = min(self.min, seconds)
+        self.max = max(self.max, seconds)
+        self.buckets[min(max(int(seconds * 1e6), 1).bit_length() - 1, BUCKETS - 1)] += 1
+
+    def percentile(self, q):
+        # Upper edge of the bucket holding the q-quantile (at most 2x off), capped at the max seen
+        rank, seen = q * self.count, 0
+        for i, n in enumerate(self.buckets):
+            seen += n
+            if n and seen >= rank:
+                return min(2 ** (i + 1) / 1e6, self.max)
+        return self.max
+
+    def summary(self):
+        ms = lambda seconds: round(seconds * 1000, 4)
+        return {'count': self.count, 'total_ms': ms(self.total), 'mean_ms': ms(self.total / self.count),
+                'min_ms': ms(self.min), 'max_ms': ms(self.max), 'p50_ms': ms(self.percentile(0.50)),
+                'p90_ms': ms(self.percentile(0.90)), 'p99_ms': ms(self.percentile(0.99))}
+
+
+# --- Recording ---
+_lock = threading.Lock()
+_stages = {}    # stage name -> Histogram
+_counters = {}  # counter name -> int
+_profiled = set()
+
+
+def record(name, seconds):
+    with _lock:
+        histogram = _stages.get(name)
+        if histogram is None:
+            histogram = _stages[name] = Histogram()
+        histogram.record(seconds)
+
+
+class _Timing:
+    # A plain class rather than @contextmanager, which would build a generator per stage
+    __slots__ = ('name', 'start')
+
+    def __init__(self, name):
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+
+
+def stage(name):
+    # with stage('spam.transform_text'): ...
+    return _Timing(name) if ENABLED else _NULL
+
+
+def timed(name):
+    # Decorator form of stage(); the function is returned untouched when instrumentation is off
+    def decorator(func):
+        if not ENABLED:
+            return func
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(name, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def count(name, n=1):
+    if ENABLED:
+        with _lock:
+            _counters[name] = _counters.get(name, 0) + n
+
+
+def snapshot():
+    with _lock:
+        return {'enabled': ENABLED, 'pid': os.getpid(),
+                'stages': {name: histogram.summary() for name, histogram in sorted(_stages.items())},
+                'counters': dict(sorted(_counters.items()))}
+
+
+def reset():
+    with _lock:
+        _stages.clear()
+        _counters.clear()
+
+
+def report():
+    # Text table of the stages, slowest total first
+    stages = snapshot()['stages']
+    lines = [f"{'stage':<32} {'count':>7} {'total ms':>10} {'mean ms':>9} {'p50 ms':>9} {'p99 ms':>9} {'max ms':>9}"]
+    for name, s in sorted(stages.items(), key=lambda item: -item[1]['total_ms']):
+        lines.append(f"{name:<32} {s['count']:>7} {s['total_ms']:>10.2f} {s['mean_ms']:>9.3f} "
+                     f"{s['p50_ms']:>9.3f} {s['p99_ms']:>9.3f} {s['max_ms']:>9.3f}")
+    return '\n'.join(lines)
+
+
+def _write_snapshot():
+    with open(OUT, 'w') as f:
+        json.dump(snapshot(), f, indent=2)
+
+
+if ENABLED and OUT:
+    atexit.register(_write_snapshot)
+
+
+# --- Profiling ---
+@contextmanager
+def capture_profile(label, directory=None):
+    # cProfile the block into <directory>/<label>-<pid>-<time>.prof (for snakeviz / pstats)
+    # plus a .txt of the 30 most expensive calls by cumulative time
+    directory = directory or PROFILE_DIR or '.'
+    os.makedirs(directory, exist_ok=True)
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        base = os.path.join(directory, f"{label}-{os.getpid()}-{time.time_ns()}")
+        profiler.dump_stats(base + '.prof')
+        text = io.StringIO()
+        pstats.Stats(profiler, stream=text).sort_stats('cumulative').print_stats(30)
+        with open(base + '.txt', 'w') as f:
+            f.write(text.getvalue())
+
+
+def profile_once(label):
+    # Profiles the first call per label when ML_PROFILE_DIR is set, then steps aside
+    if PROFILE_DIR is None or label in _profiled:
+        return _NULL
+    with _lock:
+        if label in _profiled:
+            return _NULL
+        _profiled.add(label)
+    return capture_profile(label)
@@ -0,0 +1,225 @@
+import hashlib
+import io
+import json
+import os
+import pickle
+import shutil
+import tempfile
+import warnings
+
+import numpy as np
+
+# Memory-mapped model artifacts, shared by every process that opens them.
+#
+# A pickle deserializes every numeric buffer into private memory, so N app or
+# server processes on one host hold N copies of each model. A .mmap artifact is
+# a directory next to the original file (model.pkl -> model.mmap/):
+#   object.pkl  the pickle with every large numeric array replaced by a reference
+#   0.npy ...   those arrays as raw .npy buffers
+#   source.json size and mtime of the file it was converted from
+# Loading unpickles the small skeleton and opens the arrays with np.load(mmap_mode),
+# so their pages come straight from the OS page cache, shared between processes,
+# and nothing is copied at startup. The arrays are mapped copy-on-write ('c'):
+# pages stay shared unless an estimator writes to its own arrays.
+#
+# Numeric arrays inside any pickled object are handled (TF-IDF idf_, linear
+# and naive Bayes coefficients, SVM support vectors, neighbour index arrays,
+# scipy.sparse buffers); object arrays and small arrays stay in the skeleton.
+# scikit-learn trees copy their node arrays into their own buffers on load, so
+# their arrays stay in the skeleton too: for forests the zero-copy path is
+# native_ensemble's flat node arrays (heart_native.npz -> heart_native.mmap/).
+#
+# A conversion is written to a temporary sibling directory and renamed into
+# place, so a loader never sees half of one. When the original has been
+# rebuilt since (build_model.py, incremental.py, train_heart.py, ...), its
+# size/mtime no longer match source.json: load_artifact then warns and loads
+# the original until the artifact is converted again.
+#
+#   python common/mmap_artifacts.py convert movies_dict.pkl neighbors.npz vectorizer.pkl model.pkl
+#   python common/mmap_artifacts.py verify model.pkl
+
+MIN_BYTES = 16 * 1024  # smaller arrays aren't worth a file of their own
+COPIED_ON_LOAD = {('sklearn.tree._tree', 'Tree')}  # (module, class) whose state arrays are copied on unpickling anyway
+MMAP_MODE = 'c'
+SKELETON = 'object.pkl'
+SOURCE = 'source.json'
+
+
+def mmap_path(path):
+    # model.pkl -> model.mmap (a directory)
+    return os.path.splitext(path)[0] + '.mmap'
+
+
+class _ArrayPickler(pickle.Pickler):
+    # Writes large numeric arrays to <directory>/<n>.npy and pickles a reference instead
+
+    def __init__(self, file, directory):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.directory = directory
+        self.saved = {}   # id(array) -> (file name, array); the array is kept so its id stays unique
+        self.inline = {}  # id(array) -> array, state of COPIED_ON_LOAD objects: kept in the skeleton
+
+    def reducer_override(self, obj):
+        cls = type(obj)
+        if (cls.__module__, cls.__name__) in COPIED_ON_LOAD:
+            reduced = obj.__reduce__()
+            state = reduced[2] if len(reduced) > 2 and isinstance(reduced[2], dict) else {}
+            self.inline.update((id(value), value) for value in state.values() if isinstance(value, np.ndarray))
+            return reduced
+        return NotImplemented
+
+    def persistent_id(self, obj):
+        if type(obj) not in (np.ndarray, np.memmap) or obj.dtype.hasobject or obj.nbytes < MIN_BYTES:
+            return None
+        if id(obj) in self.inline:
+            return None
+        if id(obj) not in self.saved:
+            name = f"{len(self.saved)}.npy"
+            np.save(os.path.join(self.directory, name), obj, allow_pickle=False)
+            self.saved[id(obj)] = (name, obj)
+        return self.saved[id(obj)][0]
+
+
+class _ArrayUnpickler(pickle.Unpickler):
+
+    def __init__(self, file, directory, mmap_mode):
+        super().__init__(file)
+        self.directory = directory
+        self.mmap_mode = mmap_mode
+        self.arrays = {}  # an array referenced twice in the original is mapped once
+
+    def persistent_load(self, name):
+        if name not in self.arrays:
+            self.arrays[name] = np.load(os.path.join(self.directory, name), mmap_mode=self.mmap_mode, allow_pickle=False)
+        return self.arrays[name]
+
+
+def _source_stamp(path):
+    stat = os.stat(path)
+    return {'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns}
+
+
+def dump(obj, directory, source=None):
+    # Writes obj as a .mmap directory (source: the file it came from, recorded in source.json);
+    # returns the number of arrays stored as buffers
+    parent = os.path.dirname(os.path.abspath(directory))
+    tmp = tempfile.mkdtemp(prefix=os.path.basename(directory) + '.tmp-', dir=parent)
+    try:
+        os.chmod(tmp, 0o755)  # mkdtemp's 0700 would hide it from the app/server user
+        with open(os.path.join(tmp, SKELETON), 'wb') as f:
+            pickler = _ArrayPickler(f, tmp)
+            pickler.dump(obj)
+        if source is not None:
+            with open(os.path.join(tmp, SOURCE), 'w') as f:
+                json.dump(source, f)
+        # A non-empty directory can't be renamed over: the old one is moved aside first.
+        # Loaders that find neither fall back to the original (see load_artifact).
+        old = None
+        if os.path.exists(directory):
+            old = tempfile.mkdtemp(prefix=os.path.basename(directory) + '.old-', dir=parent)
+            os.replace(directory, os.path.join(old, 'artifact'))
+        os.replace(tmp, directory)
+    except BaseException:
+        shutil.rmtree(tmp, ignore_errors=True)
+        raise
+    if old is not None:
+        shutil.rmtree(old, ignore_errors=True)  # processes that mapped its arrays keep their pages
+    return len(pickler.saved)
+
+
+def load(directory, mmap_mode=MMAP_MODE):
+    with open(os.path.join(directory, SKELETON), 'rb') as f:
+        return _ArrayUnpickler(f, directory, mmap_mode).load()
+
+
+def _read_original(path):
+    # .npz -> {name: array}, anything else is a pickle
+    if path.endswith('.npz'):
+        with np.load(path) as data:
+            return {name: data[name] for name in data.files}
+    with open(path, 'rb') as f:
+        return pickle.load(f)
+
+
+def is_current(path):
+    # True when path has a .mmap conversion made from the file as it is now
+    directory = mmap_path(path)
+    if not os.path.exists(path):  # only the .mmap was deployed
+        return os.path.isfile(os.path.join(directory, SKELETON))
+    try:
+        with open(os.path.join(directory, SOURCE)) as f:
+            return json.load(f) == _source_stamp(path)
+    except (OSError, ValueError):
+        return False
+
+
+def load_artifact(path, mmap_mode=MMAP_MODE):
+    # The .mmap version of `path` if it was converted from the current file, else the pickle/.npz itself.
+    # Drop-in loader for ModelRegistry, ModelPool, load_neighbor_index and NativeEnsemble.load.
+    directory = mmap_path(path)
+    if os.path.isdir(directory):
+        if is_current(path):
+            try:
+                return load(directory, mmap_mode)
+            except FileNotFoundError:  # replaced by a conversion running right now
+                pass
+        else:
+            warnings.warn(f"{directory} is older than {path}, loading {path} instead; "
+                          f"convert it again with common/mmap_artifacts.py", stacklevel=2)
+    return _read_original(path)
+
+
+def convert(path):
+    # Pickle / .npz -> .mmap directory next to it; returns (directory, arrays, bytes in buffers)
+    directory = mmap_path(path)
+    source = _source_stamp(path)  # taken before reading: a rebuild during the conversion leaves it stale
+    arrays = dump(_read_original(path), directory, source)
+    buffers = sum(os.path.getsize(os.path.join(directory, name)) for name in os.listdir(directory)
+                  if name.endswith('.npy'))
+    return directory, arrays, buffers
+
+
+class _FingerprintPickler(pickle.Pickler):
+    # Pickles every numeric array as (dtype, shape, digest) and without the memo
+    # (fast mode), so an artifact and its memory-mapped load give the same bytes
+    # exactly when their contents match, whichever objects happen to be shared
+
+    def __init__(self, file):
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.fast = True
+
+    def persistent_id(self, obj):
+        if not isinstance(obj, np.ndarray) or obj.dtype.hasobject:
+            return None
+        return str(obj.dtype.descr), obj.shape, hashlib.sha1(np.ascontiguousarray(obj).view(np.uint8)).hexdigest()
+
+
+def fingerprint(obj):
+    buffer = io.BytesIO()
+    _FingerprintPickler(buffer).dump(obj)
+    return hashlib.sha1(buffer.getvalue()).hexdigest()
+
+
+def verify(path):
+    return fingerprint(_read_original(path)) == fingerprint(load(mmap_path(path)))
+
+
+if __name__ == '__main__':
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Convert pickled / .npz model artifacts to memory-mapped .mmap directories.")
+    parser.add_argument('command', choices=['convert', 'verify'])
+    parser.add_argument('paths', nargs='+', help="e.g. movies_dict.pkl neighbors.npz vectorizer.pkl model.pkl pipe.pkl")
+    args = parser.parse_args()
+
+    failed = False
+    for path in args.paths:
+        if args.command == 'convert':
+            directory, arrays, buffers = convert(path)
+            print(f"{path} -> {directory}: {arrays} memory-mapped arrays, {buffers / 2**20:.2f} MB "
+                  f"(pickle {os.path.getsize(path) / 2**20:.2f} MB)")
+        else:
+            same = verify(path)
+            failed = failed or not same
+            print(f"{path}: {'identical' if same else 'DIFFERENT'}")
+    raise SystemExit(1 if failed else 0)
@@ -0,0 +1,105 @@
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+# Load generator for serving/server.py: N concurrent keep-alive connections
+# posting the same payload for a fixed duration, then throughput and latency
+# percentiles. Standard library only, like the server.
+#
+#   python serving/load_test.py --endpoint /spam/predict --connections 64 --duration 10
+#   python serving/load_test.py --endpoint /laptop/predict --payload my_laptops.json
+
+SAMPLE_PAYLOADS = {
+    '/movies/recommend': {'titles': ['Avatar'], 'k': 5},
+    '/spam/predict': {'messages': ["WINNER!! You have been selected to receive a $900 prize reward. Call now to claim"]},
+    '/heart/predict': {'patients': [{'Age': 54, 'Sex': 1, 'ChestPainType': 2, 'RestingBP': 140, 'Cholesterol': 239,
+                                     'FastingBS': 0, 'RestingECG': 1, 'MaxHR': 160, 'ExerciseAngina': 0,
+                                     'Oldpeak': 1.2, 'ST_Slope': 2}]},
+    '/laptop/predict': {'configurations': [{'Company': 'Dell', 'TypeName': 'Notebook', 'Ram': 8, 'Weight': 2.2,
+                                            'Touchscreen': 0, 'Ips': 0, 'ppi': 141.2119, 'Cpu brand': 'Intel Core i5',
+                                            'HDD': 0, 'SSD': 256, 'Gpu brand': 'Intel', 'os': 'Windows'}]},
+}
+
+
+async def read_response(reader):
+    status_line = await reader.readline()
+    if not status_line:
+        raise ConnectionError("Server closed the connection")
+    length, keep_alive = 0, True
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        if name.strip().lower() == 'content-length':
+            length = int(value)
+        elif name.strip().lower() == 'connection':
+            keep_alive = value.strip().lower() != 'close'
+    await reader.readexactly(length)
+    return int(status_line.split()[1]), keep_alive
+
+
+async def client(host, port, request, deadline, latencies, statuses):
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            writer.write(request)
+            status, keep_alive = await read_response(reader)
+            latencies.append(time.perf_counter() - start)
+            statuses[status] = statuses.get(status, 0) + 1
+            if not keep_alive:
+                writer.close()
+                reader, writer = await asyncio.open_connection(host, port)
+    finally:
+        writer.close()
+
+
+async def run(host, port, endpoint, payload, connections, duration):
+    body = json.dumps(payload).encode('utf-8')
+    request = (f"POST {endpoint} HTTP/1.1\r\nHost: {host}:{port}\r\nContent-Type: application/json\r\n"
+               f"Content-Length: {len(body)}\r\n\r\n").encode('latin-1') + body
+    latencies, statuses = [], {}
+    start = time.perf_counter()
+    deadline = start + duration
+    await asyncio.gather(*(client(host, port, request, deadline, latencies, statuses) for _ in range(connections)))
+    return latencies, statuses, time.perf_counter() - start
+
+
+def summarize(latencies, statuses, elapsed, items_per_request):
+    ms = sorted(latency * 1000 for latency in latencies)
+    percentile = lambda q: ms[min(len(ms) - 1, int(q * len(ms)))] if ms else float('nan')
+    return {
+        'requests': len(ms),
+        'statuses': statuses,
+        'seconds': round(elapsed, 2),
+        'requests_per_second': round(len(ms) / elapsed, 1),
+        'items_per_second': round(len(ms) * items_per_request / elapsed, 1),
+        'latency_ms': {'mean': round(statistics.fmean(ms), 3) if ms else None, 'p50': round(percentile(0.50), 3),
+                       'p90': round(percentile(0.90), 3), 'p99': round(percentile(0.99), 3),
+                       'max': round(ms[-1], 3) if ms else None},
+    }
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Load test the inference server.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--endpoint', default='/spam/predict', choices=list(SAMPLE_PAYLOADS))
+    parser.add_argument('--payload', default=None, help="JSON file to post instead of the built-in sample")
+    parser.add_argument('--connections', type=int, default=32)
+    parser.add_argument('--duration', type=float, default=10.0, help="seconds")
+    args = parser.parse_args()
+
+    if args.payload:
+        with open(args.payload, encoding='utf-8') as f:
+            payload = json.load(f)
+    else:
+        payload = SAMPLE_PAYLOADS[args.endpoint]
+    items = len(next(iter(value for value in payload.values() if isinstance(value, list)), [None]))
+
+    latencies, statuses, elapsed = asyncio.run(run(args.host, args.port, args.endpoint, payload,
+                                                   args.connections, args.duration))
+    print(json.dumps(summarize(latencies, statuses, elapsed, items), indent=2))
@@ -0,0 +1,230 @@
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sys
+import time
+import traceback
+from contextlib import nullcontext
+from http import HTTPStatus
+
+from services import PROJECTS, load_services
+
+import instrumentation  # common/, put on the path by services
+
+# Headless JSON-over-HTTP inference for the four projects.
+#
+# A small asyncio HTTP/1.1 server (standard library only, keep-alive): one event
+# loop per process, artifacts loaded once at startup. Inference is CPU-bound
+# and runs on the loop, so each process serves one batch at a time and
+# --workers N forks N processes that share the port (SO_REUSEPORT); the
+# artifacts are loaded before the fork, so workers share their pages.
+#
+#   python serving/server.py --port 8000 --workers 4
+#   curl -s localhost:8000/spam/predict -d '{"messages": ["WINNER!! Claim your prize now"]}'
+#
+#   GET  /health                  loaded services
+#   GET  /stats                   per-service request/item counts and time, spam and laptop cache hit rates
+#   POST /movies/recommend        {"titles": [...], "k": 5}
+#   POST /spam/predict            {"messages": [...]}
+#   POST /heart/predict           {"patients": [{"Age": 54, "Sex": 0, ...}]}
+#   POST /laptop/predict          {"configurations": [{"Company": "Dell", ...}]} or {"listings": [...]}
+#
+# With ML_INSTRUMENT=1 /stats also reports per-stage timing histograms (see
+# common/instrumentation.py). With ML_PROFILE_DIR set, the first request to each
+# endpoint is profiled with cProfile into that directory, and POST ...?profile=1
+# profiles that one request; without it, ?profile=1 is ignored.
+
+MAX_BODY = 16 * 1024 * 1024
+MAX_HEADERS = 100
+
+
+class HTTPError(Exception):
+    def __init__(self, status, message=None):
+        super().__init__(message or status.phrase)
+        self.status = status
+
+
+class InferenceServer:
+
+    def __init__(self, services):
+        self.services = services
+        self.started = time.time()
+        self.routes = {
+            ('GET', '/health'): self.health,
+            ('GET', '/stats'): self.stats,
+            ('POST', '/movies/recommend'): ('movies', 'recommend'),
+            ('POST', '/spam/predict'): ('spam', 'predict'),
+            ('POST', '/heart/predict'): ('heart', 'predict'),
+            ('POST', '/laptop/predict'): ('laptop', 'predict'),
+        }
+
+    # --- Endpoints ---
+    def health(self, payload):
+        return {'status': 'ok', 'services': sorted(self.services), 'pid': os.getpid()}
+
+    def stats(self, payload):
+        stats = {'uptime_seconds': round(time.time() - self.started, 1), 'pid': os.getpid(),
+                 'services': {name: service.stats() for name, service in self.services.items()}}
+        if instrumentation.ENABLED:
+            stats['stages'] = instrumentation.snapshot()['stages']
+        return stats
+
+    def dispatch(self, method, path, body):
+        path, _, query = path.partition('?')
+        handler = self.routes.get((method, path))
+        if handler is None:
+            known_path = any(route_path == path for _, route_path in self.routes)
+            raise HTTPError(HTTPStatus.METHOD_NOT_ALLOWED if known_path else HTTPStatus.NOT_FOUND)
+
+        payload = None
+        if method == 'POST':
+            try:
+                payload = json.loads(body)
+            except ValueError:
+                raise HTTPError(HTTPStatus.BAD_REQUEST, "Body is not valid JSON") from None
+
+        label, profile = path.strip('/').replace('/', '.'), nullcontext()
+        if isinstance(handler, tuple):
+            name, method_name = handler
+            if name not in self.services:
+                raise HTTPError(HTTPStatus.SERVICE_UNAVAILABLE, f"The {name} service is not loaded")
+            handler = getattr(self.services[name], method_name)
+            # Profiling writes files: only on a server started with ML_PROFILE_DIR, never on a client's say-so alone
+            if instrumentation.PROFILE_DIR is not None and 'profile=1' in query.split('&'):
+                profile = instrumentation.capture_profile(label)
+            else:
+                profile = instrumentation.profile_once(label)
+        try:
+            with profile, instrumentation.stage(f'request.{label}'):
+                return handler(payload)
+        except ValueError as e:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, str(e)) from None
+
+    # --- HTTP/1.1 ---
+    async def read_request(self, reader):
+        request_line = await reader.readline()
+        if not request_line:
+            return None  # client closed the connection
+        try:
+            method, path, version = request_line.decode('latin-1').split()
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Malformed request line") from None
+
+        headers = {}
+        while True:
+            line = await reader.readline()
+            if line in (b'\r\n', b'\n', b''):
+                break
+            if len(headers) >= MAX_HEADERS:
+                raise HTTPError(HTTPStatus.REQUEST_HEADER_FIELDS_TOO_LARGE)
+            name, _, value = line.decode('latin-1').partition(':')
+            headers[name.strip().lower()] = value.strip()
+
+        if 'transfer-encoding' in headers:
+            raise HTTPError(HTTPStatus.LENGTH_REQUIRED, "Send the body with a Content-Length")
+        try:
+            length = int(headers.get('content-length') or 0)
+        except ValueError:
+            raise HTTPError(HTTPStatus.BAD_REQUEST, "Invalid Content-Length") from None
+        if length > MAX_BODY:
+            raise HTTPError(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+        body = await reader.readexactly(length) if length else b''
+
+        connection = headers.get('connection', '').lower()
+        keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+        return method, path, body, keep_alive
+
+    @staticmethod
+    def response(status, payload, keep_alive):
+        body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+        head = (f"HTTP/1.1 {status.value} {status.phrase}\r\n"
+                f"Content-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n")
+        return head.encode('latin-1') + body
+
+    async def handle(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request = await self.read_request(reader)
+                except HTTPError as e:  # the rest of the request can't be trusted: answer and close
+                    writer.write(self.response(e.status, {'error': str(e)}, False))
+                    await writer.drain()
+                    break
+                except (asyncio.IncompleteReadError, ConnectionError):
+                    break
+                if request is None:
+                    break
+
+                method, path, body, keep_alive = request
+                try:
+                    status, payload = HTTPStatus.OK, self.dispatch(method, path, body)
+                except HTTPError as e:
+                    status, payload = e.status, {'error': str(e)}
+                except Exception:  # a bug in a handler must not take the worker down, nor leak its details
+                    print(f"Error handling {method} {path}:", file=sys.stderr)
+                    traceback.print_exc()
+                    status, keep_alive = HTTPStatus.INTERNAL_SERVER_ERROR, False
+                    payload = {'error': HTTPStatus.INTERNAL_SERVER_ERROR.phrase}
+
+                writer.write(self.response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+
+async def serve(server, host, port, reuse_port=False):
+    listener = await asyncio.start_server(server.handle, host, port, reuse_port=reuse_port or None, backlog=1024)
+    async with listener:
+        await listener.serve_forever()
+
+
+def run_worker(server, host, port, reuse_port):
+    try:
+        asyncio.run(serve(server, host, port, reuse_port))
+    except KeyboardInterrupt:
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description="HTTP inference server for the four Machine-Learning-Projects models.")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8000)
+    parser.add_argument('--workers', type=int, default=1, help="processes sharing the port, e.g. one per core")
+    parser.add_argument('--services', nargs='+', choices=list(PROJECTS), default=None, help="default: all")
+    parser.add_argument('--dir', action='append', default=[], metavar='SERVICE=PATH',
+                        help="load a service's artifacts from PATH instead of its project folder")
+    args = parser.parse_args()
+
+    directories = dict(item.split('=', 1) for item in args.dir)
+    services = load_services(args.services, directories)
+    if not services:
+        raise SystemExit("No service could be loaded")
+    server = InferenceServer(services)
+
+    reuse_port = args.workers > 1
+    if reuse_port and not hasattr(socket, 'SO_REUSEPORT'):
+        raise SystemExit("--workers needs SO_REUSEPORT (Linux/BSD/macOS)")
+
+    # Loaded once above, then forked: the workers share the artifacts' memory pages
+    context = multiprocessing.get_context('fork')
+    workers = [context.Process(target=run_worker, args=(server, args.host, args.port, reuse_port), daemon=True)
+               for _ in range(args.workers - 1)]
+    for worker in workers:
+        worker.start()
+    print(f"Serving {', '.join(sorted(services))} on http://{args.host}:{args.port} with {args.workers} process(es)")
+    run_worker(server, args.host, args.port, reuse_port)
+    for worker in workers:
+        worker.terminate()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,257 @@
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+# The four predictors behind the HTTP server.
+#
+# Every service loads its project's artifacts once and reuses that project's own
+# modules (Recommender, transform_text + ModelRegistry, ModelPool,
+# laptop_features + PredictionCache), so the API returns exactly what the
+# Streamlit apps show. Artifacts converted with common/mmap_artifacts.py are
+# memory-mapped instead of unpickled. Handlers take the decoded JSON body and
+# return a JSON-serializable dict; a ValueError means a bad request.
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROJECTS = {
+    'movies': '1_Movie Recommender',
+    'spam': '2_Email Spam Classifier',
+    'heart': '3_Heart Disease Predictor',
+    'laptop': '4_Laptop Price Predictor',
+}
+
+MAX_BATCH = 10_000
+MAX_K = 100
+
+# The project modules import each other by name, so every project directory goes on the path
+for _directory in [*PROJECTS.values(), 'common']:
+    if os.path.join(ROOT, _directory) not in sys.path:
+        sys.path.append(os.path.join(ROOT, _directory))
+
+from instrumentation import stage
+from mmap_artifacts import load_artifact, mmap_path
+
+
+def _batch(payload, key):
+    items = payload.get(key) if isinstance(payload, dict) else None
+    if not isinstance(items, list) or not items:
+        raise ValueError(f"Expected a non-empty list in '{key}'")
+    if len(items) > MAX_BATCH:
+        raise ValueError(f"At most {MAX_BATCH} items per request")
+    return items
+
+
+def _records(items, columns, what):
+    # [{column: value}] -> DataFrame with `columns`, or ValueError naming what's missing
+    if not all(isinstance(item, dict) for item in items):
+        raise ValueError(f"Every {what} must be a JSON object")
+    missing = sorted({col for item in items for col in columns if col not in item})
+    if missing:
+        raise ValueError(f"Missing fields in {what}: {', '.join(missing)}")
+    return pd.DataFrame([[item[col] for col in columns] for item in items], columns=columns)
+
+
+class Service:
+    name = None
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.requests = 0
+        self.items = 0
+        self.seconds = 0.0
+
+    def path(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def record(self, items, start):
+        self.requests += 1
+        self.items += items
+        self.seconds += time.perf_counter() - start
+
+    def stats(self):
+        return {'requests': self.requests, 'items': self.items, 'seconds': round(self.seconds, 4)}
+
+
+# --- 1. Movie recommendations ---
+class MovieService(Service):
+    name = 'movies'
+
+    def __init__(self, directory):
+        from neighbor_index import load_neighbor_index, load_vectors
+        from recommender import Recommender
+
+        super().__init__(directory)
+        movies = pd.DataFrame(load_artifact(self.path('movies_dict.pkl')))
+        # vectors.npz (optional, or only its .mmap conversion) allows k above the neighbour index's K
+        vectors_path = self.path('vectors.npz')
+        has_vectors = os.path.exists(vectors_path) or os.path.isdir(mmap_path(vectors_path))
+        vectors = load_vectors(vectors_path, load_artifact) if has_vectors else None
+        index = load_neighbor_index(self.path('neighbors.npz'), load_artifact)
+        self.recommender = Recommender(movies['title'].values, index=index, vectors=vectors)
+
+    def recommend(self, payload):
+        # {"titles": [...], "k": 5} -> {"results": [{"title", "recommendations"} or {"title", "error"}]}
+        start = time.perf_counter()
+        titles = _batch(payload, 'titles')
+        if not all(isinstance(title, str) for title in titles):
+            raise ValueError("Every title must be a string")
+        k = payload.get('k', 5)
+        if not isinstance(k, int) or not 1 <= k <= MAX_K:
+            raise ValueError(f"'k' must be an integer between 1 and {MAX_K}")
+
+        known = [title for title in titles if title in self.recommender.rows]
+        with stage('movies.recommend'):
+            recommendations = dict(zip(known, self.recommender.recommend_many(known, k))) if known else {}
+        results = [{'title': title, 'recommendations': recommendations[title]} if title in recommendations
+                   else {'title': title, 'error': 'unknown title'} for title in titles]
+        self.record(len(titles), start)
+        return {'results': results}
+
+
+# --- 2. Spam classification ---
+class SpamService(Service):
+    name = 'spam'
+
+    def __init__(self, directory):
+        from model_registry import ModelRegistry
+        from text_preprocessing import transform_text
+        from verdict_cache import VerdictCache
+
+        super().__init__(directory)
+        self.registry = ModelRegistry(self.path('vectorizer.pkl'), self.path('model.pkl'), load_artifact).load().warm_up()
+        self.transform_text = transform_text
+        # SPAM_ONLINE_MODEL=online_model.pkl serves the online model instead, picking up new checkpoints
+        self.online = None
+        if os.environ.get('SPAM_ONLINE_MODEL'):
+            from online_spam import HotSwapModel
+            self.online = HotSwapModel(self.path(os.environ['SPAM_ONLINE_MODEL']))
+        self.cache = VerdictCache(self.registry.tfidf, self.registry.model, stage=stage)
+
+    def predict(self, payload):
+        # {"messages": [...]} -> {"results": [{"prediction", "label", "spam_probability"}]}
+        start = time.perf_counter()
+        messages = _batch(payload, 'messages')
+        if not all(isinstance(message, str) for message in messages):
+            raise ValueError("Every message must be a string")
+
+        if self.online is not None:
+            current = self.online.current()  # one checkpoint for the whole batch, even if a swap happens meanwhile
+            vectorizer, model = current.vectorizer, current.model
+        else:
+            vectorizer, model = self.registry.tfidf, self.registry.model
+        with stage('spam.transform_text'):
+            transformed = [self.transform_text(message) for message in messages]
+        # Repeated and near-duplicate messages reuse a cached verdict; the rest go through tfidf + model in one batch
+        self.cache.set_model(vectorizer, model)
+        with stage('spam.verdict_cache'):
+            predictions, probabilities = self.cache.score(transformed)
+        results = [{'prediction': int(p), 'label': 'spam' if p == 1 else 'ham',
+                    'spam_probability': None if probabilities is None else float(probabilities[i])}
+                   for i, p in enumerate(predictions)]
+        self.record(len(messages), start)
+        return {'results': results}
+
+    def stats(self):
+        stats = {**super().stats(), 'cache': self.cache.stats()}
+        if self.online is not None:
+            stats['online_model'] = self.online.metrics()
+        return stats
+
+
+# --- 3. Heart disease ---
+class HeartService(Service):
+    name = 'heart'
+
+    def __init__(self, directory):
+        import model_pool
+
+        super().__init__(directory)
+        self.model_pool = model_pool
+        self.pool = model_pool.ModelPool.load({name: self.path(file) for name, file in model_pool.MODEL_FILES.items()},
+                                                      loader=load_artifact)
+
+    def predict(self, payload):
+        # {"patients": [{11 features}]} -> {"results": [{"LR", "SVM", "DT", "RF", "majority"}]}
+        start = time.perf_counter()
+        patients = _records(_batch(payload, 'patients'), self.model_pool.FEATURES, 'patients')
+        try:
+            patients = patients.astype(float)
+        except (TypeError, ValueError):
+            raise ValueError("Patient features must be numeric (see the app's Bulk Predict conventions)") from None
+
+        predictions = self.pool.predict_all(patients, stage=stage)
+        majority = self.pool.majority_vote(predictions)
+        columns = {self.model_pool.ABBREVIATIONS[name]: pred.astype(int).tolist() for name, pred in predictions.items()}
+        columns['majority'] = majority.tolist()
+        results = [dict(zip(columns, values)) for values in zip(*columns.values())]
+        self.record(len(results), start)
+        return {'results': results}
+
+
+# --- 4. Laptop prices ---
+class LaptopService(Service):
+    name = 'laptop'
+
+    def __init__(self, directory):
+        from laptop_features import FEATURES, RAW_COLUMNS
+        from laptop_schema import load_schema
+        from prediction_cache import PredictionCache
+        from price_batch import known_categories, predict_prices
+
+        super().__init__(directory)
+        self.pipe = load_artifact(self.path('pipe.pkl'))
+        self.categories = known_categories(self.pipe)
+        self.cache = PredictionCache(self.pipe)
+        if os.path.exists(self.path('schema.json')):
+            self.cache.prewarm(load_schema(self.path('schema.json'))['configurations'])
+        self.features, self.raw_columns, self.predict_prices = FEATURES, RAW_COLUMNS, predict_prices
+
+    def predict(self, payload):
+        # {"configurations": [{12 features, as in the app}]} or {"listings": [{raw laptop_data.csv columns}]}
+        # -> {"prices": [...]} (null where a listing can't be priced)
+        start = time.perf_counter()
+        if isinstance(payload, dict) and 'listings' in payload:
+            listings = _records(_batch(payload, 'listings'), self.raw_columns, 'listings')
+            with stage('laptop.listings'):
+                predicted = self.predict_prices(listings, self.pipe, self.categories)
+            prices = [None if np.isnan(price) else round(float(price), 2) for price in predicted]
+        else:
+            configurations = _records(_batch(payload, 'configurations'), self.features, 'configurations')
+            try:
+                with stage('laptop.predict'):
+                    prices = [round(price, 2) for price, _ in self.cache.predict_many(configurations.values.tolist())]
+            except (TypeError, ValueError):
+                raise ValueError("Invalid value in configurations: Ram, Touchscreen, Ips, HDD and SSD are integers, "
+                                 "Weight and ppi numbers") from None
+        self.record(len(prices), start)
+        return {'prices': prices}
+
+    def stats(self):
+        return {**super().stats(), 'cache': self.cache.stats()}
+
+
+SERVICES = {
+    'movies': MovieService,
+    'spam': SpamService,
+    'heart': HeartService,
+    'laptop': LaptopService,
+}
+
+
+def load_services(names=None, directories=None, log=print):
+    # {name: service} for every service whose artifacts load; the others are reported and skipped
+    directories = directories or {}
+    services = {}
+    for name in names or SERVICES:
+        directory = directories.get(name, os.path.join(ROOT, PROJECTS[name]))
+        start = time.perf_counter()
+        try:
+            services[name] = SERVICES[name](directory)
+        except (OSError, LookupError) as e:  # missing artifacts or NLTK data
+            log(f"{name}: not loaded ({e})")
+        else:
+            log(f"{name}: loaded from {directory} in {time.perf_counter() - start:.2f}s")
+    return services